@@ -0,0 +1,290 @@
+"""
+Whole-program benchmarks for every stage of the compiler. Synthetic
+EmoCode programs are generated at a chosen size along one axis each
+(statement count, expression depth, function count, class and method
+count, branch density, loop iterations) and every stage run by main.process_file is timed
+on its own, plus the run time of the generated program.
+
+Usage:
+    python benchmark.py [--scale S] [--output report.json]
+    python benchmark.py --baseline report.json     # compare against a saved run
+
+Exits with status 1 when a stage is slower than the baseline by more than
+--threshold, or when the baseline ran on another Python, lexer or target.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+
+from fastlex import FastLexer
+from lexy import new_lexer
+from parsey import parse
+from semantic import SemanticAnalyzer
+from intermediate import IntermediateCodeGenerator
+from optimizer import optimize_intermediate_code
+from codegen import generate_target_code
+
+STAGES = ("lex", "parse", "semantic", "ir", "optimize", "codegen", "run")
+
+
+def gen_statements(n):
+    """n straight-line assignments, printing every tenth value."""
+    lines = ["v0 = 0;"]
+    for i in range(1, n + 1):
+        lines.append(f"v{i} = v{i - 1} ➕ {i};")
+        if i % 10 == 0:
+            lines.append(f"🖨️(v{i});")
+    return "\n".join(lines) + "\n"
+
+
+def gen_expression_depth(n):
+    """One function whose result is an expression nested n parentheses deep."""
+    expression = "a"
+    operators = ("➕", "✖️", "➖")
+    for i in range(n):
+        expression = f"({expression} {operators[i % 3]} b)"
+    return (f"🎭 deep(a, b) {{\n    r = {expression};\n    🔙 r;\n}}\n"
+            f"call deep(1, 2);\n")
+
+
+def gen_functions(n):
+    """n functions of two parameters, each called once."""
+    lines = []
+    for i in range(n):
+        lines.append(f"🎭 f{i}(a, b) {{\n    r = a ➕ b ✖️ {i};\n    🔙 r;\n}}")
+    for i in range(n):
+        lines.append(f"call f{i}({i}, {i + 1});")
+    return "\n".join(lines) + "\n"
+
+
+def gen_classes(n, methods=5):
+    """n classes of methods printing a message, each method called once."""
+    lines = []
+    for i in range(n):
+        lines.append(f"🏛 C{i} {{")
+        for j in range(methods):
+            lines.append(f'    🎭 m{j}() {{\n        🖨️("C{i}.m{j}");\n    }}')
+        lines.append("}")
+    for i in range(n):
+        for j in range(methods):
+            lines.append(f"call C{i}.m{j};")
+    return "\n".join(lines) + "\n"
+
+
+def gen_branches(n):
+    """n if/else statements, every other one with a nested if, inside a function."""
+    lines = ["🎭 branchy(x) {", "    y = 0;"]
+    for i in range(n):
+        lines.append(f"    🤔 (x 📈 {i}) {{\n        y = y ➕ 1;")
+        if i % 2:
+            lines.append(f"        🤔 (y 🟰 {i}) {{\n            🖨️(y);\n        }}")
+        lines.append("    } 🔄 {\n        y = y ➖ 1;\n    }")
+    lines.append("    🔙 y;\n}")
+    lines.append(f"call branchy({n // 2});")
+    return "\n".join(lines) + "\n"
+
+
+def gen_loops(n):
+    """A ➿ loop of n iterations around a 🔁 loop, with invariant and induction arithmetic."""
+    return ("🎭 loops(n, m) {\n    total = 0;\n"
+            "    ➿ (i = 0; i 📉 n; i = i ➕ 1) {\n"
+            "        j = 0;\n"
+            "        🔁 (j 📉 10) {\n"
+            "            total = total ➕ i ✖️ 4 ➕ n ✖️ m;\n"
+            "            j = j ➕ 1;\n"
+            "        }\n"
+            "    }\n    🔙 total;\n}\n"
+            f"call loops({n}, 3);\n")
+
+
+# name -> (generator, size at scale 1)
+WORKLOADS = {
+    "statements": (gen_statements, 5000),
+    "expression_depth": (gen_expression_depth, 2000),
+    "functions": (gen_functions, 1000),
+    "classes": (gen_classes, 200),
+    "branches": (gen_branches, 1000),
+    "loops": (gen_loops, 20000),
+}
+
+
+def _best(func, repeat):
+    """Runs func repeat times; returns (best time in seconds, last result)."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _lex(source_code, lexer):
+    engine = FastLexer() if lexer == "fast" else new_lexer()
+    engine.input(source_code)
+    return sum(1 for _ in iter(engine.token, None))
+
+
+def _run(code_object):
+    with contextlib.redirect_stdout(io.StringIO()):
+        exec(code_object, {"__name__": "__main__"})
+
+
+def benchmark_source(source_code, repeat=3, lexer="ply", target="compiled"):
+    """
+    Times every stage on source_code, each fed the output of the previous
+    one. parse includes lexing, as it does in the compiler; lex times the
+    lexer alone. Returns {stage: seconds} plus the token count.
+    """
+    timings = {}
+    timings["lex"], tokens = _best(lambda: _lex(source_code, lexer), repeat)
+    timings["parse"], ast = _best(lambda: parse(source_code, lexer), repeat)
+    if ast is None:
+        raise ValueError("benchmark source does not parse")
+
+    def analyze():
+        analyzer = SemanticAnalyzer("<benchmark>")
+        analyzer.analyze(ast)
+        return analyzer.errors
+    timings["semantic"], errors = _best(analyze, repeat)
+    if errors:
+        raise ValueError(f"benchmark source has semantic errors: {errors[0]}")
+
+    def generate():
+        generator = IntermediateCodeGenerator()
+        generator.generate(ast)
+        return generator.code
+    timings["ir"], ir = _best(generate, repeat)
+    timings["optimize"], optimized = _best(
+        lambda: optimize_intermediate_code(ir, inline=target != "profile"), repeat)
+    timings["codegen"], target_code = _best(
+        lambda: generate_target_code(optimized, mode=target), repeat)
+    code_object = compile(target_code, "<benchmark>", "exec")
+    timings["run"], _ = _best(lambda: _run(code_object), repeat)
+    timings["tokens"] = tokens
+    return timings
+
+
+def run_suite(names=None, scale=1.0, repeat=3, lexer="ply", target="compiled"):
+    """Benchmarks the workloads in names (default: all) and returns the report dict."""
+    results = {}
+    for name in names or WORKLOADS:
+        generate, size = WORKLOADS[name]
+        size = max(1, int(size * scale))
+        source_code = generate(size)
+        timings = benchmark_source(source_code, repeat, lexer, target)
+        results[name] = {
+            "size": size,
+            "source_chars": len(source_code),
+            "tokens": timings.pop("tokens"),
+            "stages": timings,
+        }
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "lexer": lexer,
+            "target": target,
+            "scale": scale,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+# Report metadata that must match for two runs' timings to be comparable.
+COMPARABLE_META = ("python", "implementation", "lexer", "target")
+
+
+def compare(report, baseline, threshold=0.1):
+    """
+    Compares the stage timings of report with baseline. Returns a list of
+    (workload, stage, baseline seconds, current seconds, ratio, regressed),
+    where regressed means slower than the baseline by more than threshold.
+    Workloads run at different sizes are skipped. Raises ValueError if the
+    two runs differ in any of COMPARABLE_META.
+    """
+    meta, baseline_meta = report["meta"], baseline.get("meta", {})
+    mismatched = [f"{key} {baseline_meta.get(key)!r} vs {meta.get(key)!r}"
+                  for key in COMPARABLE_META if baseline_meta.get(key) != meta.get(key)]
+    if mismatched:
+        raise ValueError(f"baseline is not comparable: {', '.join(mismatched)}")
+    rows = []
+    for name, result in report["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None or old["size"] != result["size"]:
+            continue
+        for stage in STAGES:
+            before = old["stages"].get(stage)
+            after = result["stages"].get(stage)
+            if not before or after is None:
+                continue
+            ratio = after / before
+            rows.append((name, stage, before, after, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def format_report(report):
+    lines = [f"{'workload':18s}{'size':>7s}" + "".join(f"{stage:>10s}" for stage in STAGES)]
+    for name, result in report["results"].items():
+        stages = result["stages"]
+        lines.append(f"{name:18s}{result['size']:7d}"
+                     + "".join(f"{stages[stage] * 1000:8.2f}ms" for stage in STAGES))
+    return "\n".join(lines)
+
+
+def format_comparison(rows):
+    lines = [f"{'workload':18s}{'stage':10s}{'baseline':>12s}{'current':>12s}{'ratio':>8s}"]
+    for name, stage, before, after, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        lines.append(f"{name:18s}{stage:10s}{before * 1000:10.2f}ms{after * 1000:10.2f}ms"
+                     f"{ratio:8.2f}{flag}")
+    return "\n".join(lines)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="EmoCode compiler benchmarks")
+    arg_parser.add_argument("workloads", nargs="*",
+                            help=f"workloads to run (default: all of {', '.join(WORKLOADS)})")
+    arg_parser.add_argument("--scale", type=float, default=1.0,
+                            help="multiplies the size of every workload")
+    arg_parser.add_argument("--repeat", type=int, default=3,
+                            help="runs per stage; the best time is reported")
+    arg_parser.add_argument("--lexer", choices=("ply", "fast"), default="ply")
+    arg_parser.add_argument("--target",
+                            choices=("compiled", "interpreter", "profile", "binary"),
+                            default="compiled")
+    arg_parser.add_argument("-o", "--output", help="write the report as JSON to this file")
+    arg_parser.add_argument("--baseline", help="JSON report to compare the timings with")
+    arg_parser.add_argument("--threshold", type=float, default=0.1,
+                            help="slowdown ratio above which a stage counts as a regression")
+    args = arg_parser.parse_args()
+    unknown = [name for name in args.workloads if name not in WORKLOADS]
+    if unknown:
+        arg_parser.error(f"unknown workload(s): {', '.join(unknown)}")
+
+    report = run_suite(args.workloads, args.scale, args.repeat, args.lexer, args.target)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        try:
+            rows = compare(report, baseline, args.threshold)
+        except ValueError as error:
+            sys.exit(str(error))
+        print()
+        print(format_comparison(rows))
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,172 +1,535 @@
-def generate_target_code(intermediate_code):
-    python_code = '''\
-# Generated Target Code from EmoCode Intermediate Representation
-definitions = {}
-main_instructions = []
-instructions = [
-'''
-    for line in intermediate_code:
-        escaped_line = line.replace('"', '\\"')
-        python_code += f'    "{escaped_line}",\n'
-    python_code += ''']
-
-pc = 0
-# Partition instructions into definitions and main code.
-while pc < len(instructions):
-    inst = instructions[pc].strip()
-    if inst == "":
-        pc += 1
-        continue
-    # Process function definitions.
-    if inst.startswith("function"):
-        parts = inst.split()
-        func_name = parts[1].rstrip(":")
-        block = []
-        pc += 1
-        while pc < len(instructions) and not instructions[pc].strip().startswith("end function"):
-            block.append(instructions[pc])
-            pc += 1
-        definitions[func_name] = block
-        pc += 1  # Skip the "end function" line.
-    # Process class definitions.
-    elif inst.startswith("class"):
-        parts = inst.split()
-        class_name = parts[1].rstrip(":")
-        block = []
-        pc += 1
-        while pc < len(instructions) and not instructions[pc].strip().startswith("end class"):
-            block.append(instructions[pc])
-            pc += 1
-        definitions[class_name] = block
-        pc += 1  # Skip the "end class" line.
-    else:
-        main_instructions.append(inst)
-        pc += 1
-
-def execute_instructions(instr_list, initial_vars=None):
-    vars = {} if initial_vars is None else initial_vars.copy()
-    pc = 0
-    labels = {}
-    for i, line in enumerate(instr_list):
-        if line.endswith(":"):
-            labels[line[:-1]] = i
-    while pc < len(instr_list):
-        inst = instr_list[pc].strip()
-        if inst == "" or inst.endswith(":"):
-            pc += 1
+import sys
+from array import array
+from tac import (
+    Const, BINARY_OPS, COPY, LABEL, PRINT, IF_FALSE,
+    GOTO, RETURN, CALL, CALL_METHOD, FUNCTION, END_FUNCTION, CLASS, END_CLASS,
+    is_program_name,
+)
+from optimizer import live_variables, names_read_by_definitions
+from emocode_runtime import (
+    RUNTIME_VERSION, OPCODE_NAMES, OP_FUNCTION, OP_END_FUNCTION, OP_CLASS, OP_END_CLASS,
+    OP_COPY, OP_PRINT, OP_IF_FALSE, OP_GOTO, OP_RETURN, OP_CALL, OP_BINARY,
+    BINARY_MAGIC, BODY_MAIN, BODY_FUNCTION, BODY_METHOD, BODY_CLASS, NO_INDEX,
+    NO_OPERAND, VAR_OPERAND, CONST_OPERAND, CONST_INT, CONST_BIGINT, CONST_STR, CONST_BOOL,
+)
+
+# Opcode numbers of the interpreter target, as the shared runtime numbers them.
+OPCODES = {op: number for number, op in enumerate(OPCODE_NAMES)}
+
+
+def _payload_operand(arg):
+    # Literals are wrapped in a 1-tuple so the runtime can tell them from names.
+    if type(arg) is Const:
+        return (arg.value,)
+    return arg
+
+
+def encode_instructions(intermediate_code):
+    """
+    Pre-decodes the TAC for the interpreter target into (opcode, a, b, c)
+    tuples. Labels are dropped: every jump carries the index of its target
+    inside the enclosing body (main program or function body), where nested
+    definitions do not count since the runtime loads them separately.
+    """
+    positions = {}
+    counters = [0]
+    for instr in intermediate_code:
+        if instr.op == LABEL:
+            positions[instr.label] = counters[-1]
+        elif instr.op in (FUNCTION, CLASS):
+            counters.append(0)
+        elif instr.op in (END_FUNCTION, END_CLASS):
+            counters.pop()
+        else:
+            counters[-1] += 1
+
+    records = []
+    for instr in intermediate_code:
+        op = instr.op
+        if op == LABEL:
             continue
-        if inst.startswith("ifFalse"):
-            parts = inst.split()
-            cond = parts[1]
-            goto_label = parts[3]
-            try:
-                cond_val = float(cond)
-            except:
-                cond_val = vars.get(cond, 0)
-            if not cond_val:
-                pc = labels.get(goto_label, pc+1)
+        args = tuple(_payload_operand(arg) for arg in instr.args)
+        if op in BINARY_OPS or op == COPY:
+            records.append((OPCODES[op], instr.dest) + args + (None,) * (2 - len(args)))
+        elif op == PRINT:
+            # Operands after the first, if any, go in a tuple.
+            records.append((OPCODES[op], None, args[0], args[1:] or None))
+        elif op == RETURN:
+            records.append((OPCODES[op], None, args[0], None))
+        elif op in (IF_FALSE, GOTO):
+            records.append((OPCODES[op], None, args[0] if args else None, positions[instr.label]))
+        elif op in (CALL, CALL_METHOD):
+            records.append((OPCODES[op], None, args, instr.label))
+        elif op in (FUNCTION, CLASS):
+            records.append((OPCODES[op], instr.label, args, None))
+        else:
+            records.append((OPCODES[op], None, None, None))
+    return records
+
+
+def basic_blocks(intermediate_code):
+    """
+    Finds the basic blocks of every body of the encoded listing. Returns
+    {body: [(index, name), ...]} where body is 'main', a function name or
+    'Class.method' and index is the position of the block's first record
+    in that body (as in encode_instructions). A block is named by its
+    label, or body+index if it starts after a jump without one.
+    """
+    blocks = {}
+    lengths = {}
+    open_bodies = [['main', 0]]   # [name, records so far]; name None in a class body
+    blocks['main'] = {0: 'main'}
+    for instr in intermediate_code:
+        op = instr.op
+        if op == CLASS:
+            open_bodies.append([None, instr.label])
+        elif op == FUNCTION:
+            enclosing = open_bodies[-1]
+            name = instr.label if enclosing[0] is not None else f"{enclosing[1]}.{instr.label}"
+            open_bodies.append([name, 0])
+            blocks[name] = {0: name}
+        elif op in (END_FUNCTION, END_CLASS):
+            name, count = open_bodies.pop()
+            if name is not None:
+                lengths[name] = count
+        else:
+            body = open_bodies[-1]
+            if op == LABEL:
+                blocks[body[0]][body[1]] = instr.label
                 continue
-        elif inst.startswith("goto"):
-            parts = inst.split()
-            goto_label = parts[1]
-            pc = labels.get(goto_label, pc+1)
-            continue
-        elif inst.startswith("print"):
-            expr = inst[len("print"):].strip()
-            if expr.startswith('"') and expr.endswith('"'):
-                print(expr[1:-1])
+            body[1] += 1
+            if op in (IF_FALSE, GOTO, RETURN):
+                blocks[body[0]].setdefault(body[1], f"{body[0]}+{body[1]}")
+    lengths['main'] = open_bodies[0][1]
+    return {name: sorted((index, block) for index, block in entries.items()
+                         if index < lengths[name])
+            for name, entries in blocks.items()}
+
+
+RUNTIME_IMPORT = "from emocode_runtime import "
+
+
+def uses_runtime(target_code):
+    """Whether target_code is a program that imports emocode_runtime."""
+    return RUNTIME_IMPORT in target_code
+
+
+def encode_binary(intermediate_code):
+    """
+    Serializes the TAC for the interpreter into the binary container that
+    emocode_runtime.BinaryProgram reads (the format is described there).
+    The records are those of encode_instructions, so jumps keep their
+    indexes; nested definitions are split into bodies the way the
+    Interpreter splits its listing.
+    """
+    strings = {}
+    constants = {}
+    constant_words = []
+
+    def string(text):
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    def constant(value):
+        key = (type(value), value)
+        index = constants.get(key)
+        if index is None:
+            index = constants[key] = len(constants)
+            if type(value) is bool:
+                constant_words.extend((CONST_BOOL, int(value)))
+            elif type(value) is int and -(1 << 31) <= value < 1 << 31:
+                constant_words.extend((CONST_INT, value & 0xFFFFFFFF))
+            elif type(value) is int:
+                constant_words.extend((CONST_BIGINT, string(str(value))))
             else:
-                print(vars.get(expr, expr))
-        elif inst.startswith("call"):
-            execute_call(inst, vars)
-        elif " = " in inst:
-            left, right = inst.split(" = ", 1)
-            left = left.strip()
-            right = right.strip()
-            right = right.replace("➕", "+").replace("➖", "-")
-            right = right.replace("✖️", "*").replace("➗", "/")
-            right = right.replace("📈", ">").replace("📉", "<")
-            right = right.replace("🟰", "==").replace("🚫🟰", "!=")
-            try:
-                value = eval(right, vars)
-            except Exception as e:
-                value = right
-            vars[left] = value
-        elif inst.startswith("return"):
-            expr = inst[len("return"):].strip()
-            try:
-                value = eval(expr, vars)
-            except:
-                value = expr
-            print("Function returned:", value)
-            return value
-        pc += 1
-
-def execute_call(inst, outer_vars):
-    call_expr = inst[len("call"):].strip()
-    if call_expr.endswith(";"):
-        call_expr = call_expr[:-1].strip()
-    # Function call with arguments.
-    if "(" in call_expr and call_expr.endswith(")"):
-        func_name, arg_str = call_expr.split("(", 1)
-        func_name = func_name.strip()
-        arg_str = arg_str[:-1].strip()  # Remove trailing ")"
-        args = [arg.strip() for arg in arg_str.split(",") if arg.strip() != ""]
-        if func_name in definitions:
-            func_block = definitions[func_name]
-            header = func_block[0].strip() if func_block else ""
-            if "(" in header and header.endswith("):"):
-                param_str = header.split("(", 1)[1].rstrip("):")
-                params = [p.strip() for p in param_str.split(",") if p.strip() != ""]
+                constant_words.extend((CONST_STR, string(value)))
+        return index
+
+    def operand(arg):
+        if arg is None:
+            return NO_OPERAND
+        if type(arg) is tuple:
+            return constant(arg[0]) << 2 | CONST_OPERAND
+        return string(arg) << 2 | VAR_OPERAND
+
+    # [kind, name, owner, parameter words, code words] per body
+    bodies = [[BODY_MAIN, NO_INDEX, NO_INDEX, [], []]]
+    open_bodies = [bodies[0]]
+    for op, a, b, c in encode_instructions(intermediate_code):
+        if op == OP_FUNCTION:
+            enclosing = open_bodies[-1]
+            if enclosing[0] == BODY_CLASS:
+                body = [BODY_METHOD, string(a), enclosing[1], [string(p) for p in b], []]
             else:
-                params = []
-            local_vars = {}
-            for param, arg in zip(params, args):
-                # If the argument exists in outer_vars, pass its value.
-                if arg in outer_vars:
-                    local_vars[param] = outer_vars[arg]
-                else:
-                    try:
-                        local_vars[param] = float(arg)
-                    except:
-                        local_vars[param] = arg
-            ret_val = execute_instructions(func_block[1:], initial_vars=local_vars)
-            print("Function returned:", ret_val)
+                body = [BODY_FUNCTION, string(a), NO_INDEX, [string(p) for p in b], []]
+            bodies.append(body)
+            open_bodies.append(body)
+            continue
+        if op == OP_CLASS:
+            body = [BODY_CLASS, string(a), NO_INDEX, [], []]
+            bodies.append(body)
+            open_bodies.append(body)
+            continue
+        if op == OP_END_FUNCTION or op == OP_END_CLASS:
+            open_bodies.pop()
+            continue
+        code = open_bodies[-1][4]
+        if open_bodies[-1][0] == BODY_CLASS:
+            # The interpreter does not run statements of class bodies.
+            continue
+        if op >= OP_BINARY:
+            code.extend((op, string(a), operand(b), operand(c)))
+        elif op == OP_COPY:
+            code.extend((op, string(a), operand(b)))
+        elif op == OP_PRINT:
+            code.extend((op, operand(b), len(c or ())))
+            code.extend(operand(arg) for arg in c or ())
+        elif op == OP_RETURN:
+            code.extend((op, operand(b)))
+        elif op == OP_IF_FALSE:
+            code.extend((op, operand(b), c))
+        elif op == OP_GOTO:
+            code.extend((op, c))
+        elif op == OP_CALL:
+            code.extend((op, string(c), len(b)))
+            code.extend(operand(arg) for arg in b)
         else:
-            print(f"Function {func_name} not defined")
+            code.extend((op, string(c[0]), string(c[1]), len(b)))
+            code.extend(operand(arg) for arg in b)
+
+    body_words = []
+    code_words = []
+    for kind, name, owner, params, code in bodies:
+        params_start = len(code_words)
+        code_words += params
+        body_words += (kind, name, owner, params_start, len(code_words),
+                       len(code_words) + len(code))
+        code_words += code
+    blob = bytearray()
+    offsets = [0]
+    for text in strings:
+        blob += text.encode("utf-8")
+        offsets.append(len(blob))
+    blob_bytes = len(blob)
+    blob += bytes(-len(blob) % 4)
+
+    words = array('I', (RUNTIME_VERSION, len(strings), len(constants), len(bodies),
+                        len(code_words), blob_bytes))
+    for section in (offsets, constant_words, body_words, code_words):
+        words.extend(section)
+    if sys.byteorder != "little":
+        words.byteswap()
+    return BINARY_MAGIC + words.tobytes() + bytes(blob)
+
+
+def generate_interpreter_code(intermediate_code, profile=False):
+    """
+    Emits a script that holds the pre-decoded TAC (see encode_instructions)
+    and runs it through the interpreter in emocode_runtime.py, which
+    dispatches on a handler table indexed by opcode. Used as the fallback
+    target. With profile the basic blocks are passed along too and the
+    runtime counts how often every record and block runs, times every call
+    and prints the hot spots to standard error on exit.
+    """
+    lines = [
+        "# Generated Target Code from EmoCode Intermediate Representation",
+        RUNTIME_IMPORT + "run",
+        "",
+        "instructions = [",
+    ]
+    lines += [f"    {record!r}," for record in encode_instructions(intermediate_code)]
+    lines.append("]")
+    if profile:
+        lines.append(f"blocks = {basic_blocks(intermediate_code)!r}")
+        lines += ["", f"run({RUNTIME_VERSION}, instructions, blocks)", ""]
     else:
-        # Method call handling.
-        if "." in call_expr:
-            obj, remainder = call_expr.split(".", 1)
-            if "(" in remainder:
-                method_name = remainder.split("(", 1)[0].strip()
-            else:
-                method_name = remainder.strip()
-            if obj in definitions:
-                class_def = definitions[obj]
-                method_block = []
-                in_method = False
-                for line in class_def:
-                    stripped = line.strip()
-                    if stripped.startswith("function"):
-                        parts = stripped.split()
-                        if parts[1].rstrip(":") == method_name:
-                            in_method = True
-                            continue
-                    if in_method:
-                        if stripped.startswith("end function"):
-                            break
-                        method_block.append(line)
-                if method_block:
-                    execute_instructions(method_block)
+        lines += ["", f"run({RUNTIME_VERSION}, instructions)", ""]
+    return "\n".join(lines)
+
+
+# Python spelling of every EmoCode binary operator. EmoCode numbers are
+# integers, and '➗' is floor division so they stay integers: 7 ➗ 2 is 3 and
+# -7 ➗ 2 is -4, folded or not (see optimizer.FOLDERS and the runtime's
+# BINARY_OPERATORS, which must agree).
+PY_OPERATORS = {
+    '➕': '+', '➖': '-', '✖️': '*', '➗': '//',
+    '📈': '>', '📉': '<', '🟰': '==', '🚫🟰': '!=',
+    '📈🟰': '>=', '📉🟰': '<=',
+}
+
+
+class UnstructuredControlFlow(Exception):
+    """Raised when a jump cannot be expressed with if/while blocks."""
+
+
+def py_name(name, namespace="v"):
+    """
+    Maps an EmoCode identifier (emoji are allowed) to a Python identifier.
+    namespace is 'v' for variables, 'f' for functions and methods and 'c'
+    for classes: EmoCode keeps them apart, so one name may be all three.
+    """
+    if name.isascii() and name.isidentifier():
+        return f"{namespace}_{name}"
+    return f"{namespace}u_" + "_".join(f"{ord(ch):x}" for ch in name)
+
+
+def py_operand(operand):
+    if type(operand) is Const:
+        return repr(operand.value)
+    return py_name(operand)
+
+
+def _partition(instrs, pos, end_op, definitions, methods=None):
+    """
+    Collects the instructions up to end_op and returns (body, pos).
+    Function and class blocks are hoisted out of it, wherever they are
+    nested, and appended to definitions as ('function', name, params,
+    body) and ('class', name, methods); the functions of a class body
+    (methods is its list) are its methods. The statements of class bodies
+    are dropped: the interpreter never runs them.
+    """
+    body = []
+    while pos < len(instrs):
+        instr = instrs[pos]
+        pos += 1
+        if instr.op == end_op:
+            break
+        if instr.op == FUNCTION:
+            func_body, pos = _partition(instrs, pos, END_FUNCTION, definitions)
+            function = ('function', instr.label, instr.args, func_body)
+            (definitions if methods is None else methods).append(function)
+        elif instr.op == CLASS:
+            class_methods = []
+            _, pos = _partition(instrs, pos, END_CLASS, definitions, class_methods)
+            definitions.append(('class', instr.label, class_methods))
+        else:
+            body.append(instr)
+    return body, pos
+
+
+def _merge_classes(definitions):
+    # The interpreter gathers the methods of every definition of a class,
+    # a later one replacing a method of the same name; so does one Python
+    # class holding them all, where the first definition stood.
+    merged = []
+    classes = {}
+    for definition in definitions:
+        if definition[0] == 'class' and definition[1] in classes:
+            classes[definition[1]][2].extend(definition[2])
+            continue
+        if definition[0] == 'class':
+            definition = classes[definition[1]] = ('class', definition[1], list(definition[2]))
+        merged.append(definition)
+    return merged
+
+
+def _read_before_assigned(params, body):
+    # Locals some path reads before assigning them: until then they read
+    # the main-program variable of that name.
+    if not body:
+        return set()
+    assigned = {instr.dest for instr in body if instr.dest is not None}
+    return (live_variables(body)[2][0] & assigned) - set(params)
+
+
+class _BlockWriter:
+    """
+    Rebuilds structured Python statements from one straight list of TAC.
+    The shapes produced by intermediate.py are recognised:
+        ifFalse c goto A; ...; A:                   -> if c: ...
+        ifFalse c goto A; ...; goto B; A: ...; B:   -> if c: ... else: ...
+        A: ...; goto A                              -> while True: ...
+    Jumps to the label after a loop or to its head become break/continue.
+    """
+
+    def __init__(self, instrs, out):
+        self.instrs = instrs
+        self.out = out
+        self.labels = {}
+        self.loop_ends = {}
+        for i, instr in enumerate(instrs):
+            if instr.op == LABEL:
+                self.labels[instr.label] = i
+            elif instr.op == GOTO and self.labels.get(instr.label, i) < i:
+                self.loop_ends[instr.label] = i
+
+    def write(self, indent):
+        self._write_range(0, len(self.instrs), indent, None, None)
+
+    def _label_at(self, pos):
+        if pos < len(self.instrs) and self.instrs[pos].op == LABEL:
+            return self.instrs[pos].label
+        return None
+
+    def _write_range(self, lo, hi, indent, break_label, continue_label):
+        pad = "    " * indent
+        start = len(self.out)
+        pos = lo
+        while pos < hi:
+            instr = self.instrs[pos]
+            if instr.op == LABEL:
+                loop_end = self.loop_ends.get(instr.label)
+                if loop_end is not None and pos < loop_end < hi:
+                    self.out.append(f"{pad}while True:")
+                    self._write_range(pos + 1, loop_end, indent + 1,
+                                      self._label_at(loop_end + 1), instr.label)
+                    pos = loop_end + 1
                 else:
-                    print(f"Method {method_name} not found in {obj}")
+                    pos += 1
+                continue
+            if instr.op == GOTO:
+                self.out.append(pad + self._jump(instr.label, break_label, continue_label))
+                pos += 1
+                continue
+            if instr.op != IF_FALSE:
+                self.out.append(pad + self._statement(instr))
+                pos += 1
+                continue
+
+            cond, target = py_operand(instr.args[0]), instr.label
+            if target in (break_label, continue_label):
+                jump = self._jump(target, break_label, continue_label)
+                self.out.append(f"{pad}if not {cond}: {jump}")
+                pos += 1
+                continue
+            else_pos = self.labels.get(target, -1)
+            if not pos < else_pos < hi:
+                raise UnstructuredControlFlow(str(instr))
+            before_else = self.instrs[else_pos - 1]
+            end_pos = -1
+            if before_else.op == GOTO and before_else.label not in (break_label, continue_label):
+                end_pos = self.labels.get(before_else.label, -1)
+            self.out.append(f"{pad}if {cond}:")
+            if else_pos < end_pos < hi:
+                self._write_range(pos + 1, else_pos - 1, indent + 1, break_label, continue_label)
+                self.out.append(f"{pad}else:")
+                self._write_range(else_pos + 1, end_pos, indent + 1, break_label, continue_label)
+                pos = end_pos
             else:
-                print(f"Class {obj} not defined")
+                self._write_range(pos + 1, else_pos, indent + 1, break_label, continue_label)
+                pos = else_pos
+        if len(self.out) == start:
+            self.out.append(f"{pad}pass")
+
+    @staticmethod
+    def _jump(target, break_label, continue_label):
+        if target == break_label:
+            return "break"
+        if target == continue_label:
+            return "continue"
+        raise UnstructuredControlFlow(f"goto {target}")
+
+    @staticmethod
+    def _statement(instr):
+        op = instr.op
+        args = [py_operand(arg) for arg in instr.args]
+        if op in BINARY_OPS:
+            return f"{py_name(instr.dest)} = {args[0]} {PY_OPERATORS[op]} {args[1]}"
+        if op == COPY:
+            return f"{py_name(instr.dest)} = {args[0]}"
+        if op == PRINT:
+            return f"print({', '.join(args)})"
+        if op == RETURN:
+            return f"return {args[0]}"
+        if op == CALL:
+            return (f"print(\"Function returned:\", "
+                    f"{py_name(instr.label, 'f')}({', '.join(args)}))")
+        if op == CALL_METHOD:
+            obj, method = instr.label
+            return f"{py_name(obj, 'c')}.{py_name(method, 'f')}({', '.join(args)})"
+        raise UnstructuredControlFlow(f"unexpected {op} instruction")
+
+
+def _write_definition(definition, indent, out):
+    pad = "    " * indent
+    if definition[0] == 'function':
+        _, name, params, body = definition
+        if indent:
+            out.append(f"{pad}@staticmethod")
+        out.append(f"{pad}def {py_name(name, 'f')}({', '.join(py_name(p) for p in params)}):")
+        for local in sorted(_read_before_assigned(params, body)):
+            out.append(f"{pad}    {py_name(local)} = globals().get({py_name(local)!r}, "
+                       f"{local!r})")
+        _BlockWriter(body, out).write(indent + 1)
+    else:
+        _, name, methods = definition
+        out.append(f"{pad}class {py_name(name, 'c')}:")
+        for method in methods:
+            out.append("")
+            _write_definition(method, indent + 1, out)
+        if not methods:
+            out.append(f"{pad}    pass")
+
+
+def generate_compiled_code(intermediate_code):
+    """
+    Translates the TAC into plain Python source: a def per function block,
+    a class per class block (methods become static methods) and if/while
+    statements recovered from the ifFalse/goto/label structure. Raises
+    UnstructuredControlFlow when a jump does not fit that structure.
+    Variables of the main program are module globals, which function
+    bodies read; the compiler's temporaries stay local to main(). Every
+    variable the program reads starts out bound to its own name, the value
+    the interpreter gives a variable that was never assigned.
+    """
+    definitions = []
+    main_body, _ = _partition(intermediate_code, 0, None, definitions)
+
+    out = ["# Generated Target Code from EmoCode Intermediate Representation", "", ""]
+    for definition in _merge_classes(definitions):
+        _write_definition(definition, 0, out)
+        out += ["", ""]
+
+    read = {name for instr in main_body for name in instr.uses()}
+    read = sorted(name for name in read | names_read_by_definitions(intermediate_code)
+                  if is_program_name(name))
+    for name in read:
+        out.append(f"{py_name(name)} = {name!r}")
+    if read:
+        out += ["", ""]
+    out.append("def main():")
+    assigned = sorted({py_name(instr.dest) for instr in main_body
+                       if instr.dest is not None and is_program_name(instr.dest)})
+    if assigned:
+        out.append(f"    global {', '.join(assigned)}")
+    _BlockWriter(main_body, out).write(1)
+    out += ["", "", "main()", ""]
+    return "\n".join(out)
+
+
+def generate_binary_code(intermediate_code):
+    """
+    Emits a script that holds the program as a binary container (see
+    encode_binary) in a bytes literal and runs it through
+    emocode_runtime.run_binary. The .pyc stores the container as one bytes
+    constant, and the runtime decodes only the bodies that are called.
+    """
+    return "\n".join([
+        "# Generated Target Code from EmoCode Intermediate Representation",
+        RUNTIME_IMPORT + "run_binary",
+        "",
+        f"run_binary({encode_binary(intermediate_code)!r})",
+        "",
+    ])
 
-execute_instructions(main_instructions)
-'''
-    return python_code
 
-if __name__ == '__main__':
-    pass
+def generate_target_code(intermediate_code, mode="compiled"):
+    """
+    Generates the target Python program. mode is "compiled" (structured
+    Python, falling back to the interpreter if control flow cannot be
+    recovered), "interpreter", "profile" (the interpreter with its
+    execution profiler) or "binary" (the interpreter fed a binary
+    container).
+    """
+    if mode == "profile":
+        return generate_interpreter_code(intermediate_code, profile=True)
+    if mode == "binary":
+        return generate_binary_code(intermediate_code)
+    if mode == "compiled":
+        try:
+            return generate_compiled_code(intermediate_code)
+        except UnstructuredControlFlow:
+            pass
+    return generate_interpreter_code(intermediate_code)
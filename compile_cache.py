@@ -0,0 +1,82 @@
+import hashlib
+import os
+import pickle
+from collections import namedtuple
+
+COMPILER_VERSION = "1.0"
+
+# Modules whose source takes part in the cache key, so editing the compiler
+# invalidates earlier results even without a version bump.
+COMPILER_MODULES = (
+    "lexy", "fastlex", "parsey", "streaming", "nodes", "visitor", "semantic",
+    "intermediate", "optimizer", "codegen", "tac", "emocode_runtime", "emocode",
+)
+
+CacheEntry = namedtuple("CacheEntry", "ast ir target_code")
+
+
+def compiler_fingerprint():
+    digest = hashlib.sha256(COMPILER_VERSION.encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for module in COMPILER_MODULES:
+        with open(os.path.join(here, module + ".py"), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+class CompileCache:
+    """
+    On-disk cache of compilation results. Each entry holds the AST (None
+    for streamed compilations, which never build it whole, and for ASTs too
+    deep to pickle), the optimized
+    IR and the target code and is keyed by the hash of the source text, the
+    target mode and the compiler fingerprint.
+    """
+
+    def __init__(self, directory=".emocode_cache"):
+        self.directory = directory
+        self.fingerprint = compiler_fingerprint()
+
+    def key(self, source_code, target):
+        return self.stream_key((source_code,), target)
+
+    def stream_key(self, chunks, target):
+        """The key of the source text made of chunks, hashed piece by piece."""
+        digest = hashlib.sha256(self.fingerprint.encode())
+        digest.update(target.encode())
+        for chunk in chunks:
+            digest.update(chunk.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".pickle")
+
+    def load(self, key):
+        """Returns the CacheEntry stored under key, or None on a miss."""
+        try:
+            with open(self._path(key), "rb") as entry_file:
+                entry = CacheEntry(*pickle.load(entry_file))
+        except (OSError, pickle.UnpicklingError, EOFError, TypeError,
+                AttributeError, ImportError):
+            # AttributeError and ImportError: the entry pickles a class that
+            # has been renamed or moved since.
+            return None
+        return entry
+
+    def store(self, key, ast, ir, target_code):
+        try:
+            data = pickle.dumps(tuple(CacheEntry(ast, ir, target_code)),
+                                protocol=pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            # pickle recurses once per nesting level; an AST too deep for it
+            # is left out and the entry keeps the IR and target code.
+            data = pickle.dumps(tuple(CacheEntry(None, ir, target_code)),
+                                protocol=pickle.HIGHEST_PROTOCOL)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a concurrent reader never sees half an entry.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as entry_file:
+            entry_file.write(data)
+        os.replace(temp_path, path)
+
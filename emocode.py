@@ -0,0 +1,138 @@
+"""
+Library entry points of the compiler. translate runs the pipeline from
+source text to target Python; compile_source and run turn that into a
+code object and execute it in-process, so a program runs without a .py
+file being written or another interpreter being started:
+
+    import emocode
+    emocode.run('🖨️("Hello");')
+"""
+
+import contextlib
+import io
+from functools import lru_cache
+from parsey import parse
+from semantic import SemanticAnalyzer
+from intermediate import IntermediateCodeGenerator
+from optimizer import optimize_intermediate_code
+from codegen import generate_target_code
+from nodes import count_nodes
+from profiling import Profiler
+
+
+class CompileError(Exception):
+    """Raised when a source does not compile; messages holds the diagnostics."""
+
+    def __init__(self, messages):
+        super().__init__("\n".join(messages))
+        self.messages = messages
+
+
+def translate(segments, filename, messages, target="compiled", lexer="ply", profiler=None):
+    """
+    Parses, checks, lowers, optimizes and generates code for segments, the
+    source text in runs of complete top-level statements (a single string
+    in a 1-tuple when it is not streamed). Each segment is parsed and
+    lowered before the next is read, but the TAC of every segment is kept
+    for optimization and code generation. Diagnostics are appended to
+    messages. With profiler every stage is measured in it, with counts.
+    :return: (AST of the last segment, optimized TAC, target code), or None
+             if the source does not compile.
+    """
+    counts = profiler is not None
+    stage = (profiler or Profiler(filename, memory=False)).stage
+    analyzer = SemanticAnalyzer(filename)
+    generator = IntermediateCodeGenerator()
+    first_line = first_col = 1
+    for segment in segments:
+        # Parsing. Lexer and parser errors are printed by PLY callbacks, so
+        # capture them to keep them with the rest of this file's diagnostics.
+        with stage("parse") as record:
+            with contextlib.redirect_stdout(io.StringIO()) as parse_output:
+                ast = parse(segment, lexer, first_line, record.counts if counts else None,
+                            first_col)
+        # Segments may end mid-line, so the next one starts where this ended.
+        last_newline = segment.rfind("\n")
+        if last_newline < 0:
+            first_col += len(segment)
+        else:
+            first_line += segment.count("\n")
+            first_col = len(segment) - last_newline
+        messages.extend(parse_output.getvalue().splitlines())
+        if ast is None:
+            messages.append("Parsing failed.")
+            return None
+        if counts:
+            record.add(nodes=count_nodes(ast))
+        # Semantic Analysis
+        with stage("semantic"):
+            analyzer.analyze(ast)
+        # Intermediate Code Generation
+        if not analyzer.errors:
+            with stage("ir") as record:
+                generated = len(generator.code)
+                generator.generate(ast)
+                record.add(instructions=len(generator.code) - generated)
+    if analyzer.errors:
+        messages.append("Semantic errors found:")
+        messages.extend(analyzer.errors)
+        return None
+    # Optimization. The profile target reports time per function, so its
+    # calls are not inlined.
+    with stage("optimize") as record:
+        optimized_code = optimize_intermediate_code(generator.code, inline=target != "profile")
+        record.add(instructions_before=len(generator.code),
+                   instructions_after=len(optimized_code))
+    # Target Code Generation
+    with stage("codegen") as record:
+        target_code = generate_target_code(optimized_code, mode=target)
+        record.add(lines=target_code.count("\n") + 1)
+    return ast, optimized_code, target_code
+
+
+@lru_cache(maxsize=256)
+def _compile(source, filename, target, lexer):
+    # Repeated runs of one script skip the whole pipeline.
+    messages = []
+    translation = translate((source,), filename, messages, target, lexer)
+    if translation is None:
+        raise CompileError(messages)
+    target_code = translation[2]
+    return compile(target_code, filename, "exec"), target_code
+
+
+def compile_source(source, filename="<emocode>", target="compiled", lexer="ply"):
+    """
+    Compiles EmoCode source text to a Python code object. Raises
+    CompileError if it does not compile. The results for the most recent
+    sources are kept in memory.
+    """
+    return _compile(source, filename, target, lexer)[0]
+
+
+def run_target(target_code, filename="<emocode>", namespace=None):
+    """
+    Executes generated target code (a string or a code object) in
+    namespace, a fresh module namespace by default, and returns it.
+    """
+    if namespace is None:
+        namespace = {"__name__": "__main__"}
+    if type(target_code) is str:
+        target_code = compile(target_code, filename, "exec")
+    exec(target_code, namespace)
+    return namespace
+
+
+def run(source, filename="<emocode>", target="compiled", lexer="ply", dump=None,
+        namespace=None):
+    """
+    Compiles EmoCode source text and runs it in this process; see
+    compile_source and run_target. With dump the target code is also
+    written to that file.
+    :return: the namespace the program ran in.
+    """
+    code_object, target_code = _compile(source, filename, target, lexer)
+    if dump is not None:
+        with open(dump, "w", encoding="utf-8") as target_file:
+            target_file.write(target_code)
+    return run_target(code_object, filename, namespace)
@@ -0,0 +1,494 @@
+"""
+Runtime of the interpreter, profile and binary targets. Programs generated
+for them hold only their pre-decoded instruction listing (see
+codegen.encode_instructions) or binary container (see codegen.encode_binary)
+and a call of run() or run_binary(), so the interpreter is compiled once
+into this module's .pyc instead of into every program. This module must be
+importable where the programs run; `python emocode_runtime.py prog.emoc`
+runs a binary container file.
+
+RUNTIME_VERSION is bumped whenever the record encoding, the binary format
+or the opcode numbering changes; programs for another version are refused.
+
+The binary container is a 4-byte magic followed by little-endian 32-bit
+words:
+    header      version, strings, constants, bodies, code words, blob bytes
+    offsets     strings + 1 byte offsets of the strings in the blob
+    constants   (tag, payload) per constant
+    bodies      (kind, name, owner, params start, code start, code end)
+                per body; the parameter names are the words of the code
+                stream from params start to code start
+    code        the records of every body, one opcode word followed by
+                its operands (see BinaryProgram.decode_body)
+    blob        the UTF-8 text of the string table, padded to a word
+Names and string values refer to the string table by index, literals to
+the constant pool and jumps to record indexes inside the body.
+"""
+
+import mmap
+import sys
+import time
+from array import array
+
+RUNTIME_VERSION = 2
+
+# Opcode numbers. Binary operators follow OP_BINARY in BINARY_OPERATORS order.
+OP_FUNCTION, OP_END_FUNCTION, OP_CLASS, OP_END_CLASS = 0, 1, 2, 3
+OP_COPY, OP_PRINT, OP_IF_FALSE, OP_GOTO, OP_RETURN, OP_CALL, OP_CALL_METHOD = 4, 5, 6, 7, 8, 9, 10
+OP_BINARY = 11
+BINARY_OPERATORS = (
+    ('➕', lambda a, b: a + b),
+    ('➖', lambda a, b: a - b),
+    ('✖️', lambda a, b: a * b),
+    ('➗', lambda a, b: a // b),      # floor division, as codegen.PY_OPERATORS
+    ('📈', lambda a, b: a > b),
+    ('📉', lambda a, b: a < b),
+    ('🟰', lambda a, b: a == b),
+    ('🚫🟰', lambda a, b: a != b),
+    ('📈🟰', lambda a, b: a >= b),
+    ('📉🟰', lambda a, b: a <= b),
+)
+# The TAC opcode (tac.py) of every opcode number.
+OPCODE_NAMES = ['function', 'end function', 'class', 'end class', 'copy', 'print', 'ifFalse',
+                'goto', 'return', 'call', 'call_method'] + [name for name, _ in BINARY_OPERATORS]
+
+# Binary container format.
+BINARY_MAGIC = b"EMOC"
+HEADER_WORDS = 6
+BODY_WORDS = 6
+BODY_MAIN, BODY_FUNCTION, BODY_METHOD, BODY_CLASS = 0, 1, 2, 3
+NO_INDEX = 0xFFFFFFFF
+# An operand word is an index shifted left by 2 with one of these tags.
+NO_OPERAND, VAR_OPERAND, CONST_OPERAND = 0, 1, 2
+# Constant pool tags; a CONST_INT payload is a 32-bit two's complement
+# integer, CONST_BIGINT and CONST_STR payloads are string table indexes.
+CONST_INT, CONST_BIGINT, CONST_STR, CONST_BOOL = 0, 1, 2, 3
+
+
+class RuntimeVersionError(Exception):
+    pass
+
+
+def check_version(version):
+    if version != RUNTIME_VERSION:
+        raise RuntimeVersionError(
+            f"program encoded for EmoCode runtime version {version}, "
+            f"but this is version {RUNTIME_VERSION}: recompile it")
+
+
+class Interpreter:
+    """
+    Runs one program's listing of (opcode, a, b, c) records. Builds the
+    dispatch tables once: every function and (class, method) pair maps to
+    its parameter names and its body, sliced out of the listing.
+    """
+
+    def __init__(self, instructions):
+        self.functions = {}
+        self.methods = {}
+        self.classes = set()
+        self.main_instructions = []
+        self.global_vars = {}
+        open_blocks = [(None, None, None, self.main_instructions)]
+        for inst in instructions:
+            op = inst[0]
+            if op == OP_FUNCTION or op == OP_CLASS:
+                open_blocks.append((op, inst[1], inst[2], []))
+            elif op == OP_END_FUNCTION or op == OP_END_CLASS:
+                kind, name, params, body = open_blocks.pop()
+                if kind == OP_CLASS:
+                    self.classes.add(name)
+                elif open_blocks[-1][0] == OP_CLASS:
+                    self.methods[(open_blocks[-1][1], name)] = (params, body)
+                else:
+                    self.functions[name] = (params, body)
+            else:
+                open_blocks[-1][3].append(inst)
+
+        # Each handler executes one record and returns the index of the next one.
+        self.handlers = [None, None, None, None, self.op_copy, self.op_print, self.op_if_false,
+                         self.op_goto, None, self.op_call, self.op_call]
+        self.handlers += [self.binary_handler(operator) for _, operator in BINARY_OPERATORS]
+
+    def value_of(self, arg, vars):
+        if type(arg) is tuple:
+            return arg[0]
+        if arg in vars:
+            return vars[arg]
+        # Function bodies can read main program variables.
+        return self.global_vars.get(arg, arg)
+
+    def op_copy(self, inst, vars, pc):
+        vars[inst[1]] = self.value_of(inst[2], vars)
+        return pc
+
+    def op_print(self, inst, vars, pc):
+        if inst[3] is None:
+            print(self.value_of(inst[2], vars))
+        else:
+            print(self.value_of(inst[2], vars), *[self.value_of(arg, vars) for arg in inst[3]])
+        return pc
+
+    def op_if_false(self, inst, vars, pc):
+        if not self.value_of(inst[2], vars):
+            return inst[3]
+        return pc
+
+    def op_goto(self, inst, vars, pc):
+        return inst[3]
+
+    def op_call(self, inst, vars, pc):
+        self.execute_call(inst[0], [self.value_of(arg, vars) for arg in inst[2]], inst[3])
+        return pc
+
+    def binary_handler(self, operator):
+        value_of = self.value_of
+
+        def op_binary(inst, vars, pc):
+            vars[inst[1]] = operator(value_of(inst[2], vars), value_of(inst[3], vars))
+            return pc
+        return op_binary
+
+    def execute_instructions(self, instr_list, vars):
+        handlers = self.handlers
+        pc = 0
+        end = len(instr_list)
+        while pc < end:
+            inst = instr_list[pc]
+            op = inst[0]
+            if op == OP_RETURN:
+                return self.value_of(inst[2], vars)
+            pc = handlers[op](inst, vars, pc + 1)
+
+    def function(self, name):
+        """The (parameter names, body) of function name, or None."""
+        return self.functions.get(name)
+
+    def method(self, target):
+        """The (parameter names, body) of the (class, method) pair target, or None."""
+        return self.methods.get(target)
+
+    def execute_call(self, op, arg_values, target):
+        if op == OP_CALL:
+            entry = self.function(target)
+            if entry is None:
+                print(f"Function {target} not defined")
+                return
+            params, body = entry
+            ret_val = self.execute_instructions(body, dict(zip(params, arg_values)))
+            print("Function returned:", ret_val)
+            return
+        # Method call handling.
+        entry = self.method(target)
+        if entry is None:
+            obj, method_name = target
+            if obj in self.classes:
+                print(f"Method {method_name} not found in {obj}")
+            else:
+                print(f"Class {obj} not defined")
+            return
+        params, body = entry
+        self.execute_instructions(body, dict(zip(params, arg_values)))
+
+    def run(self):
+        self.execute_instructions(self.main_instructions, self.global_vars)
+
+
+class ProfilingInterpreter(Interpreter):
+    """
+    The interpreter of the profile target: counts every record executed
+    and times every call. print_profile reports the hot spots, with the
+    basic blocks of codegen.basic_blocks.
+    """
+
+    def __init__(self, instructions, blocks):
+        super().__init__(instructions)
+        self.blocks = blocks
+        self.bodies = {'main': self.main_instructions}
+        for name, (params, body) in self.functions.items():
+            self.bodies[name] = body
+        for (obj, name), (params, body) in self.methods.items():
+            self.bodies[obj + '.' + name] = body
+        # id(body) -> how often each record of body ran
+        self.instruction_counts = {id(body): [0] * len(body) for body in self.bodies.values()}
+        self.call_stats = {}           # call target -> [calls, cumulative seconds]
+
+    def execute_instructions(self, instr_list, vars):
+        hits = self.instruction_counts[id(instr_list)]
+        handlers = self.handlers
+        pc = 0
+        end = len(instr_list)
+        while pc < end:
+            hits[pc] += 1
+            inst = instr_list[pc]
+            op = inst[0]
+            if op == OP_RETURN:
+                return self.value_of(inst[2], vars)
+            pc = handlers[op](inst, vars, pc + 1)
+
+    def execute_call(self, op, arg_values, target):
+        started = time.perf_counter()
+        try:
+            super().execute_call(op, arg_values, target)
+        finally:
+            stats = self.call_stats.setdefault(target, [0, 0.0])
+            stats[0] += 1
+            stats[1] += time.perf_counter() - started
+
+    def print_profile(self, out=None, top=20):
+        if out is None:
+            out = sys.stderr
+        rows = []
+        for name, body in self.bodies.items():
+            for pc, count in enumerate(self.instruction_counts[id(body)]):
+                if count:
+                    rows.append((count, name, pc, OPCODE_NAMES[body[pc][0]]))
+        rows.sort(key=lambda row: -row[0])
+        print("\n== EmoCode profile: hottest instructions ==", file=out)
+        print(f"{'count':>12}  {'body':24} {'index':>6}  op", file=out)
+        for count, name, pc, op_name in rows[:top]:
+            print(f"{count:12d}  {name:24} {pc:6d}  {op_name}", file=out)
+        blocks = []
+        for name, entries in self.blocks.items():
+            hits = self.instruction_counts[id(self.bodies[name])]
+            for pc, block in entries:
+                if hits[pc]:
+                    blocks.append((hits[pc], name, block))
+        blocks.sort(key=lambda row: -row[0])
+        print("\n== Basic blocks ==", file=out)
+        print(f"{'count':>12}  {'body':24} block", file=out)
+        for count, name, block in blocks[:top]:
+            print(f"{count:12d}  {name:24} {block}", file=out)
+        calls = sorted(self.call_stats.items(), key=lambda item: -item[1][1])
+        print("\n== Calls (cumulative time) ==", file=out)
+        print(f"{'calls':>12}  {'total ms':>10}  {'per call us':>11}  target", file=out)
+        for target, (count, seconds) in calls[:top]:
+            label = '.'.join(target) if type(target) is tuple else target
+            print(f"{count:12d}  {seconds * 1000:10.3f}  {seconds * 1e6 / count:11.1f}  {label}",
+                  file=out)
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            self.print_profile()
+
+
+class BinaryProgram:
+    """
+    A program in the binary container format, read in place from any
+    buffer (bytes, mmap, ...). Only the header and the body table are read
+    up front; strings, constants and the records of a body are decoded the
+    first time they are needed. functions and methods map function names
+    and (class, method) pairs to body indexes; classes holds the class names.
+    """
+
+    def __init__(self, buffer):
+        data = memoryview(buffer).cast('B')
+        if bytes(data[:4]) != BINARY_MAGIC:
+            raise ValueError("not an EmoCode binary program")
+        words = data[4:].cast('I')
+        if sys.byteorder != "little":
+            words = array('I', words)
+            words.byteswap()
+            words = memoryview(words)
+        check_version(words[0])
+        n_strings, n_constants, n_bodies, n_code, blob_bytes = words[1:HEADER_WORDS]
+        pos = HEADER_WORDS
+        self._offsets = words[pos:pos + n_strings + 1]
+        pos += n_strings + 1
+        self._constant_words = words[pos:pos + 2 * n_constants]
+        pos += 2 * n_constants
+        self._bodies = words[pos:pos + BODY_WORDS * n_bodies]
+        pos += BODY_WORDS * n_bodies
+        self._code = words[pos:pos + n_code]
+        pos += n_code
+        self._blob = data[4 + 4 * pos:4 + 4 * pos + blob_bytes]
+        self._strings = [None] * n_strings
+        self._constants = [None] * n_constants
+        self._decoded = {}
+
+        self.main = None
+        self.functions = {}
+        self.methods = {}
+        self.classes = set()
+        for index in range(n_bodies):
+            kind, name, owner = self._bodies[BODY_WORDS * index:BODY_WORDS * index + 3]
+            if kind == BODY_MAIN:
+                self.main = index
+            elif kind == BODY_FUNCTION:
+                self.functions[self.string(name)] = index
+            elif kind == BODY_METHOD:
+                self.methods[(self.string(owner), self.string(name))] = index
+            else:
+                self.classes.add(self.string(name))
+
+    def close(self):
+        """Releases the views of the buffer, so that an mmap can be closed."""
+        for view in (self._offsets, self._constant_words, self._bodies, self._code, self._blob):
+            view.release()
+
+    def string(self, index):
+        value = self._strings[index]
+        if value is None:
+            value = self._strings[index] = str(
+                self._blob[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+        return value
+
+    def constant(self, index):
+        # Wrapped in a 1-tuple, as literal operands are in the records.
+        value = self._constants[index]
+        if value is None:
+            tag, payload = self._constant_words[2 * index:2 * index + 2]
+            if tag == CONST_INT:
+                literal = payload - (1 << 32) if payload >= 1 << 31 else payload
+            elif tag == CONST_BIGINT:
+                literal = int(self.string(payload))
+            elif tag == CONST_STR:
+                literal = self.string(payload)
+            else:
+                literal = bool(payload)
+            value = self._constants[index] = (literal,)
+        return value
+
+    def operand(self, word):
+        tag = word & 3
+        if tag == VAR_OPERAND:
+            return self.string(word >> 2)
+        if tag == CONST_OPERAND:
+            return self.constant(word >> 2)
+        return None
+
+    def params(self, index):
+        """The parameter names of body index."""
+        base = BODY_WORDS * index
+        return tuple(self.string(word)
+                     for word in self._code[self._bodies[base + 3]:self._bodies[base + 4]])
+
+    def body(self, index):
+        """The records of body index, as Interpreter executes them."""
+        records = self._decoded.get(index)
+        if records is None:
+            records = self._decoded[index] = self.decode_body(index)
+        return records
+
+    def decode_body(self, index):
+        """
+        Decodes the records of body index from the code stream. After its
+        opcode word a record holds:
+            binary operators    dest, left, right
+            copy                dest, value
+            print               value, count of further values, further values
+            return              value
+            ifFalse             value, target index
+            goto                target index
+            call                name, argument count, arguments
+            call_method         class, method, argument count, arguments
+        where dest, name, class and method are string table indexes and
+        the rest are operand words.
+        """
+        code = self._code
+        string = self.string
+        operand = self.operand
+        base = BODY_WORDS * index
+        pos, end = self._bodies[base + 4], self._bodies[base + 5]
+        records = []
+        while pos < end:
+            op = code[pos]
+            if op >= OP_BINARY:
+                records.append((op, string(code[pos + 1]), operand(code[pos + 2]),
+                                operand(code[pos + 3])))
+                pos += 4
+            elif op == OP_COPY:
+                records.append((op, string(code[pos + 1]), operand(code[pos + 2]), None))
+                pos += 3
+            elif op == OP_PRINT:
+                count = code[pos + 2]
+                rest = tuple(operand(word) for word in code[pos + 3:pos + 3 + count]) or None
+                records.append((op, None, operand(code[pos + 1]), rest))
+                pos += 3 + count
+            elif op == OP_RETURN:
+                records.append((op, None, operand(code[pos + 1]), None))
+                pos += 2
+            elif op == OP_IF_FALSE:
+                records.append((op, None, operand(code[pos + 1]), code[pos + 2]))
+                pos += 3
+            elif op == OP_GOTO:
+                records.append((op, None, None, code[pos + 1]))
+                pos += 2
+            elif op == OP_CALL:
+                count = code[pos + 2]
+                args = tuple(operand(word) for word in code[pos + 3:pos + 3 + count])
+                records.append((op, None, args, string(code[pos + 1])))
+                pos += 3 + count
+            elif op == OP_CALL_METHOD:
+                count = code[pos + 3]
+                args = tuple(operand(word) for word in code[pos + 4:pos + 4 + count])
+                records.append((op, None, args, (string(code[pos + 1]), string(code[pos + 2]))))
+                pos += 4 + count
+            else:
+                raise ValueError(f"bad opcode {op} in EmoCode binary program")
+        return records
+
+
+class BinaryInterpreter(Interpreter):
+    """Runs a BinaryProgram, decoding each body the first time it is called."""
+
+    def __init__(self, program):
+        super().__init__(())
+        self.program = program
+        self.classes = program.classes
+        self.main_instructions = program.body(program.main)
+
+    def function(self, name):
+        entry = self.functions.get(name)
+        if entry is None:
+            index = self.program.functions.get(name)
+            if index is None:
+                return None
+            entry = self.functions[name] = (self.program.params(index), self.program.body(index))
+        return entry
+
+    def method(self, target):
+        entry = self.methods.get(target)
+        if entry is None:
+            index = self.program.methods.get(target)
+            if index is None:
+                return None
+            entry = self.methods[target] = (self.program.params(index), self.program.body(index))
+        return entry
+
+
+def run(version, instructions, blocks=None):
+    """
+    Entry point of generated programs: runs the listing instructions,
+    encoded for runtime version. With blocks, the basic blocks of the
+    listing, the program runs under the profiler.
+    """
+    check_version(version)
+    if blocks is None:
+        Interpreter(instructions).run()
+    else:
+        ProfilingInterpreter(instructions, blocks).run()
+
+
+def run_binary(program):
+    """
+    Entry point of binary programs: runs a binary container given as a
+    buffer or as the name of a file, which is memory-mapped.
+    """
+    if type(program) is not str:
+        BinaryInterpreter(BinaryProgram(program)).run()
+        return
+    with open(program, "rb") as program_file:
+        with mmap.mmap(program_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            binary = BinaryProgram(data)
+            try:
+                BinaryInterpreter(binary).run()
+            finally:
+                binary.close()
+
+
+if __name__ == '__main__':
+    for filename in sys.argv[1:]:
+        run_binary(filename)
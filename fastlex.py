@@ -0,0 +1,197 @@
+import re
+import sys
+import time
+from collections import namedtuple
+
+import lexy
+
+# Tokens are plain tuples. They carry the same attributes the parser reads
+# from PLY's LexToken; lexer is there because PLY attaches it to the token
+# it hands to p_error.
+Token = namedtuple("Token", "type value lineno lexpos lexer")
+_new_token = tuple.__new__
+
+_IDENTIFIER = re.compile(lexy.t_VAR.__doc__)
+_NUMBER = re.compile(r'\d+')
+_STRING = re.compile(lexy.t_STRING.__doc__)
+# lexy counts newlines in t_newline; here they are skipped with the rest.
+_IGNORE = frozenset(lexy.t_ignore + '\n')
+
+# What the first character of a token selects. Anything else is looked up
+# in the operator trie.
+_IDENTIFIER_START = 'identifier'
+_NUMBER_START = 'number'
+_STRING_START = 'string'
+_COMMENT_START = 'comment'
+
+# Marks a trie node that ends a token; maps to the token type.
+_END = ''
+
+
+def _literal_rules():
+    # (type, text) of the string rules of lexy, in definition order, with
+    # their regex escapes removed.
+    for name, rule in vars(lexy).items():
+        if name.startswith('t_') and type(rule) is str and name != 't_ignore':
+            yield name[2:], re.sub(r'\\(.)', r'\1', rule)
+
+
+def build_trie():
+    """
+    Builds the longest-match trie of the emoji operators, keywords and
+    punctuation of lexy, one level per codepoint. Where two rules spell the
+    same text (🎭 is both FUNCTION and OBJECT) the first one defined wins, as
+    it does in PLY's master regex.
+    """
+    trie = {}
+    for token_type, text in _literal_rules():
+        if _IDENTIFIER.match(text):
+            continue  # 'call' and co. are reserved words of the identifier rule.
+        node = trie
+        for char in text:
+            node = node.setdefault(char, {})
+        node.setdefault(_END, token_type)
+    return trie
+
+
+def _first_characters():
+    first = {}
+    # The leading character class of t_VAR, e.g. [😀🔥a-zA-Z].
+    start_class = re.match(r'\[([^\]]*)\]', lexy.t_VAR.__doc__).group(1)
+    for low, high in re.findall(r'(.)(?:-(.))?', start_class):
+        for code in range(ord(low), ord(high or low) + 1):
+            first[chr(code)] = _IDENTIFIER_START
+    for char in "0123456789":
+        first[char] = _NUMBER_START
+    first['"'] = _STRING_START
+    first['#'] = _COMMENT_START
+    return first
+
+
+TRIE = build_trie()
+FIRST_CHARACTERS = _first_characters()
+
+
+class FastLexer:
+    """
+    Hand-written single-pass lexer for the token set of lexy.py, usable
+    wherever the parser expects a PLY lexer (input(), token(), clone()).
+    Identifiers, numbers and strings are matched with one anchored regex
+    each; operators and keywords walk TRIE codepoint by codepoint and take
+    the longest match. Tokens are Token tuples instead of LexToken objects.
+    """
+
+    def __init__(self):
+        self.lexdata = ""
+        self.lexpos = 0
+        self.lexlen = 0
+        self.lineno = 1
+        # Line number -> offset of its first character, as in lexy.t_newline.
+        self.line_starts = {1: 0}
+
+    def clone(self):
+        return FastLexer()
+
+    def input(self, data):
+        self.lexdata = data
+        self.lexpos = 0
+        self.lexlen = len(data)
+
+    def token(self):
+        data = self.lexdata
+        pos = self.lexpos
+        end = self.lexlen
+        while pos < end:
+            char = data[pos]
+            if char in _IGNORE:
+                pos += 1
+                if char == '\n':
+                    self.lineno += 1
+                    self.line_starts[self.lineno] = pos
+                continue
+            start = FIRST_CHARACTERS.get(char)
+            if start is _IDENTIFIER_START:
+                match = _IDENTIFIER.match(data, pos)
+                value = match.group()
+                self.lexpos = match.end()
+                return _new_token(Token, (lexy.reserved.get(value, 'VAR'), value,
+                                          self.lineno, pos, self))
+            elif start is _NUMBER_START:
+                match = _NUMBER.match(data, pos)
+                self.lexpos = match.end()
+                return _new_token(Token, ('NUMBER', int(match.group()), self.lineno, pos, self))
+            elif start is _STRING_START:
+                match = _STRING.match(data, pos)
+                if match:
+                    self.lexpos = match.end()
+                    return _new_token(Token, ('STRING', match.group()[1:-1],
+                                              self.lineno, pos, self))
+            elif start is _COMMENT_START:
+                newline = data.find('\n', pos)
+                pos = end if newline < 0 else newline
+                continue
+            elif start is None:
+                node = TRIE.get(char)
+                token_type = None
+                scan = pos
+                while node is not None:
+                    scan += 1
+                    if _END in node:
+                        token_type = node[_END]
+                        token_end = scan
+                    node = node.get(data[scan]) if scan < end else None
+                if token_type is not None:
+                    self.lexpos = token_end
+                    return _new_token(Token, (token_type, data[pos:token_end],
+                                              self.lineno, pos, self))
+                # \d also accepts digits outside ASCII.
+                match = _NUMBER.match(data, pos)
+                if match:
+                    self.lexpos = match.end()
+                    return _new_token(Token, ('NUMBER', int(match.group()), self.lineno, pos, self))
+            # Same recovery as lexy.t_error: report and skip one character.
+            print(f"Illegal character: {char}")
+            pos += 1
+        self.lexpos = pos
+        return None
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+
+def benchmark(source_code, repeat=5):
+    """
+    Lexes source_code with the PLY lexer and with FastLexer, checks that
+    both produce the same tokens and returns the best time of each in
+    seconds as {"ply": ..., "fast": ..., "tokens": n}.
+    """
+    engines = {"ply": lexy.new_lexer, "fast": FastLexer}
+    streams = {}
+    timings = {}
+    for name, make_lexer in engines.items():
+        best = None
+        for _ in range(repeat):
+            lexer = make_lexer()
+            started = time.perf_counter()
+            lexer.input(source_code)
+            stream = [(tok.type, tok.value, tok.lexpos) for tok in iter(lexer.token, None)]
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        streams[name] = stream
+        timings[name] = best
+    if streams["ply"] != streams["fast"]:
+        raise AssertionError("FastLexer and the PLY lexer disagree on this source")
+    timings["tokens"] = len(streams["fast"])
+    return timings
+
+
+if __name__ == '__main__':
+    # Usage: python fastlex.py file.ec ...
+    for filename in sys.argv[1:]:
+        with open(filename, "r", encoding="utf-8") as source_file:
+            result = benchmark(source_file.read())
+        print(f"{filename}: {result['tokens']} tokens")
+        for name in ("ply", "fast"):
+            rate = result['tokens'] / result[name] if result[name] else float('inf')
+            print(f"  {name:5s} {result[name] * 1000:9.2f} ms  {rate:12.0f} tokens/s")
+        print(f"  speedup {result['ply'] / result['fast']:.2f}x")
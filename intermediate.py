@@ -1,145 +1,167 @@
-temp_counter = 0
-label_counter = 0
+import ast
 
-def new_temp():
-    global temp_counter
-    temp_counter += 1
-    return f"t{temp_counter}"
+from tac import (
+    Instr, Const, LABEL, COPY, PRINT, IF_FALSE, GOTO, RETURN, CALL, CALL_METHOD,
+    FUNCTION, END_FUNCTION, CLASS, END_CLASS,
+)
+from visitor import Visitor
 
-def new_label():
-    global label_counter
-    label_counter += 1
-    return f"L{label_counter}"
 
-def generate_intermediate_code(node):
+class IntermediateCodeGenerator(Visitor):
     """
-    Recursively traverses the AST (node) and returns a tuple (code, result)
-    where 'code' is a list of TAC instructions and 'result' is the temporary
-    variable holding the expression's value (if applicable).
+    Generates the TAC of one compilation. Every node appends its
+    instructions to the single shared buffer self.code, so building the IR
+    costs time linear in its size. The temporary and label counters are per
+    generator: every program numbers its temporaries from _t1. EmoCode
+    names cannot contain '_', so temporaries never clash with them.
     """
-    if node is None:
-        return [], None
-
-    node_type = node[0]
-
-    if node_type == "program":
-        code = []
-        for stmt in node[1]:
-            stmt_code, _ = generate_intermediate_code(stmt)
-            code.extend(stmt_code)
-        return code, None
-
-    elif node_type == "assign":
-        var_name = node[1]
-        code_expr, result = generate_intermediate_code(node[2])
-        code = code_expr + [f"{var_name} = {result}"]
-        return code, var_name
-
-    elif node_type == "number":
-        return [], str(node[1])
-
-    elif node_type == "string":
-        return [], f"\"{node[1]}\""
-
-    elif node_type == "var":
-        return [], node[1]
-
-    elif node_type == "binop":
-        code_left, left_temp = generate_intermediate_code(node[2])
-        code_right, right_temp = generate_intermediate_code(node[3])
-        temp = new_temp()
-        code = code_left + code_right + [f"{temp} = {left_temp} {node[1]} {right_temp}"]
-        return code, temp
-
-    elif node_type == "relop":
-        code_left, left_temp = generate_intermediate_code(node[2])
-        code_right, right_temp = generate_intermediate_code(node[3])
-        temp = new_temp()
-        code = code_left + code_right + [f"{temp} = {left_temp} {node[1]} {right_temp}"]
-        return code, temp
-
-    elif node_type == "print":
-        code_expr, result = generate_intermediate_code(node[1])
-        code = code_expr + [f"print {result}"]
-        return code, None
-
-    elif node_type == "if_else":
-        code_cond, cond_temp = generate_intermediate_code(node[1])
-        label_else = new_label()
-        label_end = new_label()
-        code_true = []
-        for stmt in node[2]:
-            stmt_code, _ = generate_intermediate_code(stmt)
-            code_true.extend(stmt_code)
-        code_false = []
-        for stmt in node[3]:
-            stmt_code, _ = generate_intermediate_code(stmt)
-            code_false.extend(stmt_code)
-        code = (
-            code_cond +
-            [f"ifFalse {cond_temp} goto {label_else}"] +
-            code_true +
-            [f"goto {label_end}", f"{label_else}:"] +
-            code_false +
-            [f"{label_end}:"]
-        )
-        return code, None
-
-    elif node_type == "if":
-        code_cond, cond_temp = generate_intermediate_code(node[1])
-        label_end = new_label()
-        code_true = []
-        for stmt in node[2]:
-            stmt_code, _ = generate_intermediate_code(stmt)
-            code_true.extend(stmt_code)
-        code = code_cond + [f"ifFalse {cond_temp} goto {label_end}"] + code_true + [f"{label_end}:"]
-        return code, None
-
-    elif node_type == "function_def":
-        func_name = node[1]
-        params = node[2]
-        code = [f"function {func_name}:"]
-        for stmt in node[3]:
-            stmt_code, _ = generate_intermediate_code(stmt)
-            for line in stmt_code:
-                code.append("    " + line)
-        code.append("end function")
-        return code, None
-
-    elif node_type == "return":
-        code_expr, result = generate_intermediate_code(node[1])
-        code = code_expr + [f"return {result}"]
-        return code, None
-
-    elif node_type == "class_def":
-        class_name = node[1]
-        code = [f"class {class_name}:"]
-        for stmt in node[2]:
-            stmt_code, _ = generate_intermediate_code(stmt)
-            for line in stmt_code:
-                code.append("    " + line)
-        code.append("end class")
-        return code, None
-
-    elif node_type == "call_function":
-        arg_codes = []
+
+    def __init__(self):
+        self.code = []
+        self.emit = self.code.append
+        self.temp_counter = 0
+        self.label_counter = 0
+
+    def new_temp(self):
+        self.temp_counter += 1
+        return f"_t{self.temp_counter}"
+
+    def new_label(self):
+        self.label_counter += 1
+        return f"L{self.label_counter}"
+
+    def generate(self, node):
+        """
+        Traverses the AST (node), appending its TAC instructions (tac.Instr)
+        to self.code, and returns the operand holding the expression's value
+        (if applicable): a variable or temporary name, or a tac.Const.
+        """
+        return self.visit(node)
+
+    def visit_program(self, node):
+        for stmt in node.body:
+            yield stmt
+
+    def visit_assign(self, node):
+        result = yield node.value
+        self.emit(Instr(COPY, node.name, (result,)))
+        return node.name
+
+    def visit_number(self, node):
+        return Const(node.value)
+
+    def visit_string(self, node):
+        # String literals keep their escapes in the AST; decode them once here.
+        return Const(ast.literal_eval(f'"{node.value}"'))
+
+    def visit_var(self, node):
+        return node.name
+
+    def visit_binop(self, node):
+        left_temp = yield node.left
+        right_temp = yield node.right
+        temp = self.new_temp()
+        self.emit(Instr(node.op, temp, (left_temp, right_temp)))
+        return temp
+
+    visit_relop = visit_binop
+
+    def visit_print(self, node):
+        result = yield node.value
+        self.emit(Instr(PRINT, None, (result,)))
+
+    def visit_if_else(self, node):
+        emit = self.emit
+        cond_temp = yield node.cond
+        label_else = self.new_label()
+        label_end = self.new_label()
+        emit(Instr(IF_FALSE, None, (cond_temp,), label_else))
+        for stmt in node.body:
+            yield stmt
+        emit(Instr(GOTO, label=label_end))
+        emit(Instr(LABEL, label=label_else))
+        for stmt in node.orelse:
+            yield stmt
+        emit(Instr(LABEL, label=label_end))
+
+    def visit_if(self, node):
+        cond_temp = yield node.cond
+        label_end = self.new_label()
+        self.emit(Instr(IF_FALSE, None, (cond_temp,), label_end))
+        for stmt in node.body:
+            yield stmt
+        self.emit(Instr(LABEL, label=label_end))
+
+    def visit_while(self, node):
+        # L_head: cond; ifFalse cond goto L_end; body; goto L_head; L_end:
+        emit = self.emit
+        label_head = self.new_label()
+        label_end = self.new_label()
+        emit(Instr(LABEL, label=label_head))
+        cond_temp = yield node.cond
+        emit(Instr(IF_FALSE, None, (cond_temp,), label_end))
+        for stmt in node.body:
+            yield stmt
+        emit(Instr(GOTO, label=label_head))
+        emit(Instr(LABEL, label=label_end))
+
+    def visit_for(self, node):
+        # init, then a while loop whose body ends with the update.
+        emit = self.emit
+        yield node.init
+        label_head = self.new_label()
+        label_end = self.new_label()
+        emit(Instr(LABEL, label=label_head))
+        cond_temp = yield node.cond
+        emit(Instr(IF_FALSE, None, (cond_temp,), label_end))
+        for stmt in node.body:
+            yield stmt
+        yield node.update
+        emit(Instr(GOTO, label=label_head))
+        emit(Instr(LABEL, label=label_end))
+
+    def visit_function_def(self, node):
+        self.emit(Instr(FUNCTION, None, tuple(node.params), node.name))
+        for stmt in node.body:
+            yield stmt
+        self.emit(Instr(END_FUNCTION))
+
+    def visit_return(self, node):
+        result = yield node.value
+        self.emit(Instr(RETURN, None, (result,)))
+
+    def visit_class_def(self, node):
+        self.emit(Instr(CLASS, label=node.name))
+        for stmt in node.body:
+            yield stmt
+        self.emit(Instr(END_CLASS))
+
+    def visit_call_function(self, node):
         arg_results = []
-        for arg in node[2]:
-            code_arg, res = generate_intermediate_code(arg)
-            arg_codes.extend(code_arg)
-            arg_results.append(res)
+        for arg in node.args:
+            arg_results.append((yield arg))
         # This produces an instruction like: call add(t3, t4)
-        return arg_codes + [f"call {node[1]}({', '.join(arg_results)})"], None
+        self.emit(Instr(CALL, None, tuple(arg_results), node.name))
 
+    def visit_call_method(self, node):
+        arg_results = []
+        for arg in node.args:
+            arg_results.append((yield arg))
+        self.emit(Instr(CALL_METHOD, None, tuple(arg_results), (node.obj, node.method)))
 
-    elif node_type == "call_method":
-        return [f"call {node[1]}.{node[2]}"], None
+    def visit_call(self, node):
+        return (yield node.call)
 
-    elif node_type == "call":
-        return generate_intermediate_code(node[1])
 
-    else:
-        return [], None
+def generate_intermediate_code(node):
+    """
+    Generates the TAC for a whole AST with fresh counters.
+    :return: (code, result) - the list of tac.Instr and the operand holding
+             the value of node, if it is an expression.
+    """
+    generator = IntermediateCodeGenerator()
+    result = generator.generate(node)
+    return generator.code, result
 
 # Module exposes generate_intermediate_code() function.
 if __name__ == '__main__':
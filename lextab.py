@@ -0,0 +1,11 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('ASSIGN', 'BREAK', 'CALL', 'CASE', 'CLASS', 'CLOSE_BRACE', 'CLOSE_PAREN', 'COMMA', 'DEFAULT', 'DIV', 'DOT', 'ELSE', 'EQUAL', 'FOR', 'FUNCTION', 'GE', 'GT', 'IF', 'INPUT', 'LE', 'LT', 'MINUS', 'MULT', 'NE', 'NUMBER', 'OBJECT', 'OPEN_BRACE', 'OPEN_PAREN', 'PLUS', 'PRINT', 'RETURN', 'SEMICOLON', 'STRING', 'SWITCH', 'VAR', 'WHILE'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_VAR>[😀🔥💰🔧🚗🚦a-zA-Z][😀🔥💰🔧🚗📜🚦a-zA-Z0-9]*)|(?P<t_NUMBER>\\d+)|(?P<t_STRING>\\"([^\\\\\\n]|(\\\\.))*?\\")|(?P<t_COMMENT>\\#.*)|(?P<t_newline>\\n+)|(?P<t_CALL>call)|(?P<t_CLOSE_BRACE>\\})|(?P<t_CLOSE_PAREN>\\))|(?P<t_DOT>\\.)|(?P<t_GE>📈🟰)|(?P<t_LE>📉🟰)|(?P<t_MULT>✖️)|(?P<t_NE>🚫🟰)|(?P<t_OPEN_BRACE>\\{)|(?P<t_OPEN_PAREN>\\()|(?P<t_PRINT>🖨️)|(?P<t_ASSIGN>=)|(?P<t_BREAK>❌)|(?P<t_CASE>🔂)|(?P<t_CLASS>🏛)|(?P<t_COMMA>,)|(?P<t_DEFAULT>🚪)|(?P<t_DIV>➗)|(?P<t_ELSE>🔄)|(?P<t_EQUAL>🟰)|(?P<t_FOR>➿)|(?P<t_FUNCTION>🎭)|(?P<t_GT>📈)|(?P<t_IF>🤔)|(?P<t_INPUT>📥)|(?P<t_LT>📉)|(?P<t_MINUS>➖)|(?P<t_OBJECT>🎭)|(?P<t_PLUS>➕)|(?P<t_RETURN>🔙)|(?P<t_SEMICOLON>;)|(?P<t_SWITCH>🔀)|(?P<t_WHILE>🔁)', [None, ('t_VAR', 'VAR'), ('t_NUMBER', 'NUMBER'), ('t_STRING', 'STRING'), None, None, ('t_COMMENT', 'COMMENT'), ('t_newline', 'newline'), (None, 'CALL'), (None, 'CLOSE_BRACE'), (None, 'CLOSE_PAREN'), (None, 'DOT'), (None, 'GE'), (None, 'LE'), (None, 'MULT'), (None, 'NE'), (None, 'OPEN_BRACE'), (None, 'OPEN_PAREN'), (None, 'PRINT'), (None, 'ASSIGN'), (None, 'BREAK'), (None, 'CASE'), (None, 'CLASS'), (None, 'COMMA'), (None, 'DEFAULT'), (None, 'DIV'), (None, 'ELSE'), (None, 'EQUAL'), (None, 'FOR'), (None, 'FUNCTION'), (None, 'GT'), (None, 'IF'), (None, 'INPUT'), (None, 'LT'), (None, 'MINUS'), (None, 'OBJECT'), (None, 'PLUS'), (None, 'RETURN'), (None, 'SEMICOLON'), (None, 'SWITCH'), (None, 'WHILE')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
+_emocode_rules_hash = 'a7eb6822'
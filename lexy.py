@@ -1,3 +1,7 @@
+import os
+import sys
+import zlib
+
 import ply.lex as lex
 
 # Updated tokens list including DOT and CALL
@@ -76,10 +80,73 @@ def t_COMMENT(t):
     r'\#.*'
     pass
 
-t_ignore = ' \t\n'
+def t_newline(t):
+    r'\n+'
+    # line_starts maps each line number to the offset its text starts at,
+    # so a token's column is known in O(1) from its line and lexpos.
+    lexer = t.lexer
+    for offset in range(t.lexpos + 1, t.lexpos + len(t.value) + 1):
+        lexer.lineno += 1
+        lexer.line_starts[lexer.lineno] = offset
+
+t_ignore = ' \t'
 
 def t_error(t):
     print(f"Illegal character: {t.value[0]}")
     t.lexer.skip(1)
 
-lexer = lex.lex()
+def rules_hash():
+    """Fingerprint of the token rules. lextab.py records it to detect stale tables."""
+    module = sys.modules[__name__]
+    text = [repr((tokens, sorted(reserved.items())))]
+    for name in sorted(vars(module)):
+        if name.startswith('t_'):
+            rule = getattr(module, name)
+            text.append(f"{name}={rule.__doc__ if callable(rule) else rule}")
+    return format(zlib.crc32("\n".join(text).encode()), "08x")
+
+def build_table(outputdir):
+    """Writes the frozen lexer table lextab.py into outputdir."""
+    table_lexer = lex.lex(module=sys.modules[__name__])
+    table_lexer.writetab('lextab', outputdir)
+    with open(os.path.join(outputdir, 'lextab.py'), 'a') as table_file:
+        table_file.write(f"_emocode_rules_hash = {rules_hash()!r}\n")
+
+def _load_frozen_lexer():
+    try:
+        import lextab
+    except ImportError:
+        return None
+    if getattr(lextab, '_emocode_rules_hash', None) != rules_hash():
+        return None
+    frozen = lex.Lexer()
+    frozen.lexoptimize = True
+    frozen.readtab(lextab, globals())
+    return frozen
+
+_lexer = None
+
+def get_lexer():
+    """
+    Returns the shared lexer, created on first use. It is loaded from the
+    frozen lextab.py without re-validating the rules; if that table is
+    missing or stale the lexer is built in memory instead. Nothing is
+    written to disk either way.
+    """
+    global _lexer
+    if _lexer is None:
+        _lexer = _load_frozen_lexer() or lex.lex(module=sys.modules[__name__])
+    return _lexer
+
+def __getattr__(name):
+    # The module-level 'lexer' is only built when somebody asks for it.
+    if name == 'lexer':
+        return get_lexer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def new_lexer():
+    """Returns an independent lexer (fresh position and line count) for one compilation."""
+    lexer = get_lexer().clone()
+    lexer.lineno = 1
+    lexer.line_starts = {1: 0}
+    return lexer
@@ -1,53 +1,241 @@
-import sys
+import argparse
+import contextlib
 import glob
-from lexy import lexer
-from parsey import parser
-from semantic import SemanticAnalyzer
-from intermediate import generate_intermediate_code
-from optimizer import optimize_intermediate_code
-from codegen import generate_target_code
-
-def process_file(filename):
-    with open(filename, "r", encoding="utf-8") as source_file:
-        source_code = source_file.read()
-    print(f"\nProcessing {filename} ...")
-    
-    # Parsing
-    ast = parser.parse(source_code)
-    if ast is None:
-        print("Parsing failed.")
-        return
-    # Semantic Analysis
-    analyzer = SemanticAnalyzer()
-    analyzer.analyze(ast)
-    if analyzer.errors:
-        print("Semantic errors found:")
-        for error in analyzer.errors:
-            print(error)
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import emocode_runtime
+from codegen import uses_runtime, encode_binary
+from emocode import translate, run_target
+from compile_cache import CompileCache
+from streaming import read_chunks, stream_statements
+from profiling import Profiler, JsonLinesSink, TableSink
+
+# Outcome of compiling one file. messages holds the diagnostics in the order
+# they were produced; cached is None when no cache was used; profile holds
+# the StageRecords of a profiled compilation; target_code holds the target
+# code of a successful compilation.
+CompileResult = namedtuple("CompileResult", "filename ok messages cached profile target_code",
+                           defaults=(None, None))
+
+def write_target(target_filename, target_code):
+    # Leaves an up-to-date target untouched so its mtime and .pyc stay valid.
+    # target_code is text, or bytes for a binary container.
+    mode = "b" if type(target_code) is bytes else "t"
+    encoding = None if mode == "b" else "utf-8"
+    try:
+        with open(target_filename, "r" + mode, encoding=encoding) as target_file:
+            if target_file.read() == target_code:
+                return False
+    except OSError:
+        pass
+    with open(target_filename, "w" + mode, encoding=encoding) as target_file:
+        target_file.write(target_code)
+    return True
+
+def install_runtime(target_filename):
+    # Programs of the interpreter targets import emocode_runtime: keep a copy
+    # of it next to them unless they are written beside this one.
+    runtime_filename = os.path.join(os.path.dirname(target_filename) or ".",
+                                    "emocode_runtime.py")
+    if os.path.exists(runtime_filename) and os.path.samefile(runtime_filename,
+                                                             emocode_runtime.__file__):
         return
-    # Intermediate Code Generation
-    intermediate_code, _ = generate_intermediate_code(ast)
-    # Optimization
-    optimized_code = optimize_intermediate_code(intermediate_code)
-    # Target Code Generation
-    target_code = generate_target_code(optimized_code)
-    # Write the target code to a file (or you could run it directly)
+    with open(emocode_runtime.__file__, "r", encoding="utf-8") as runtime_file:
+        write_target(runtime_filename, runtime_file.read())
+
+def save_target(target_filename, target_code):
+    """Writes target code, and the runtime it imports if any, to target_filename."""
+    write_target(target_filename, target_code)
+    if uses_runtime(target_code):
+        install_runtime(target_filename)
+
+def save_container(filename, optimized_code):
+    """
+    Writes the binary container of optimized_code next to the target of
+    filename, as <name>.emoc; `python emocode_runtime.py <name>.emoc` runs
+    it memory-mapped, without the .py loader.
+    """
+    write_target(filename.replace(".ec", ".emoc"), encode_binary(optimized_code))
+
+def process_file(filename, target="compiled", cache=None, lexer="ply", stream=False,
+                 profile=False, write=True):
+    """
+    Compiles one .ec file to its .py target. Nothing is printed here: the
+    diagnostics are returned in a CompileResult so callers running several
+    compilations at once can report them in a stable order. With stream the
+    source is read in chunks and each run of complete top-level statements
+    is parsed, checked and lowered to TAC as soon as it has been read, so
+    neither the whole text nor the whole AST is ever held in memory; the
+    TAC of the whole program is (see streaming). With
+    profile every stage is measured and its profiling.StageRecord returned
+    in CompileResult.profile. The target code is returned in
+    CompileResult.target_code and, with write, also written to the .py
+    file; the binary target then writes its container to <name>.emoc too.
+    """
+    messages = [f"\nProcessing {filename} ..."]
+    profiler = Profiler(filename, memory=profile)
+    stage = profiler.stage
+
+    def result(ok, cached, target_code=None):
+        return CompileResult(filename, ok, messages, cached, profiler.records if profile else None,
+                             target_code)
+
+    with stage("read"):
+        if stream:
+            segments = stream_statements(filename)
+            key = None if cache is None else cache.stream_key(read_chunks(filename), target)
+        else:
+            with open(filename, "r", encoding="utf-8") as source_file:
+                source_code = source_file.read()
+            segments = (source_code,)
+            key = None if cache is None else cache.key(source_code, target)
     target_filename = filename.replace(".ec", ".py")
-    with open(target_filename, "w", encoding="utf-8") as target_file:
-        target_file.write(target_code)
-    print(f"Target code generated successfully in '{target_filename}'.")
-    # Optionally, you can run the generated target code here.
-    
+
+    # Unchanged sources reuse the stored result of the previous compilation.
+    if cache is not None:
+        with stage("cache"):
+            entry = cache.load(key)
+        if entry is not None:
+            if write:
+                with stage("write"):
+                    save_target(target_filename, entry.target_code)
+                    if target == "binary":
+                        save_container(filename, entry.ir)
+                messages.append(f"Target code in '{target_filename}' is up to date (cached).")
+            return result(True, True, entry.target_code)
+    cached = None if cache is None else False
+
+    translation = translate(segments, filename, messages, target, lexer,
+                            profiler if profile else None)
+    if translation is None:
+        return result(False, cached)
+    ast, optimized_code, target_code = translation
+    if cache is not None:
+        with stage("cache"):
+            cache.store(key, None if stream else ast, optimized_code, target_code)
+    # Write the target code to a file, unless the caller runs it directly.
+    if write:
+        with stage("write"):
+            save_target(target_filename, target_code)
+            if target == "binary":
+                save_container(filename, optimized_code)
+        messages.append(f"Target code generated successfully in '{target_filename}'.")
+    return result(True, cached, target_code)
+
+# Per-process state of the --jobs workers.
+_worker_cache = None
+_worker_lexer = "ply"
+_worker_stream = False
+_worker_profile = False
+_worker_write = True
+
+def _init_worker(cache_dir, lexer, stream, profile, write):
+    global _worker_cache, _worker_lexer, _worker_stream, _worker_profile, _worker_write
+    _worker_cache = None if cache_dir is None else CompileCache(cache_dir)
+    _worker_lexer = lexer
+    _worker_stream = stream
+    _worker_profile = profile
+    _worker_write = write
+
+def _compile_in_worker(job):
+    filename, target = job
+    return process_file(filename, target, _worker_cache, _worker_lexer, _worker_stream,
+                        _worker_profile, _worker_write)
+
+def _compile_all(files, target, cache_dir, jobs, lexer, stream, profile, write):
+    if jobs <= 1 or len(files) <= 1:
+        cache = None if cache_dir is None else CompileCache(cache_dir)
+        for filename in files:
+            yield process_file(filename, target, cache, lexer, stream, profile, write)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(cache_dir, lexer, stream, profile, write)) as pool:
+        yield from pool.map(_compile_in_worker, [(filename, target) for filename in files])
+
+def compile_files(files, target="compiled", cache_dir=None, jobs=1, lexer="ply", stream=False,
+                  profile_sinks=(), write=True):
+    """
+    Compiles files, yielding their CompileResults in the order of files.
+    With jobs > 1 the files are spread over a pool of worker processes.
+    With profile_sinks every compilation is profiled and the StageRecords
+    of each file are passed to every sink before its result is yielded.
+    Without write the target code is only returned in the results, not
+    written (see process_file).
+    """
+    profile = bool(profile_sinks)
+    for result in _compile_all(files, target, cache_dir, jobs, lexer, stream, profile, write):
+        for record in result.profile or ():
+            for sink in profile_sinks:
+                sink(record)
+        yield result
+
 def main():
+    arg_parser = argparse.ArgumentParser(description="EmoCode compiler")
+    arg_parser.add_argument("files", nargs="*", help="EmoCode sources (default: *.ec)")
+    arg_parser.add_argument("--target",
+                            choices=("compiled", "interpreter", "profile", "binary"),
+                            default="compiled",
+                            help="emit structured Python, a TAC listing for the shared "
+                                 "interpreter, the interpreter with an execution profiler, or a "
+                                 "binary container for the interpreter (also written on its own "
+                                 "as <name>.emoc)")
+    arg_parser.add_argument("--cache-dir", default=".emocode_cache",
+                            help="directory of the incremental compilation cache")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="always compile every file from scratch")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=1,
+                            help="number of files compiled in parallel (0: one per CPU)")
+    arg_parser.add_argument("--lexer", choices=("ply", "fast"), default="ply",
+                            help="lexer engine: PLY (lexy.py) or the hand-written fastlex.py")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="read sources in chunks and compile them statement by statement")
+    arg_parser.add_argument("--profile", choices=("table", "jsonl"),
+                            help="measure time, peak memory and sizes of every compiler stage")
+    arg_parser.add_argument("--profile-output",
+                            help="file the profile is written to (default: standard error)")
+    arg_parser.add_argument("--run", action="store_true",
+                            help="run every compiled program in this process instead of writing "
+                                 "its .py file; diagnostics go to standard error")
+    arg_parser.add_argument("--dump", action="store_true",
+                            help="with --run, also write the .py files (and the .emoc "
+                                 "files of --target binary)")
+    args = arg_parser.parse_args()
     # If file names are passed as arguments, process them
-    if len(sys.argv) > 1:
-        files = sys.argv[1:]
+    if args.files:
+        files = args.files
     else:
         # Otherwise, process all .ec files in the current directory.
-        files = glob.glob("*.ec")
-    
-    for filename in files:
-        process_file(filename)
+        files = sorted(glob.glob("*.ec"))
+
+    jobs = args.jobs or os.cpu_count() or 1
+    cache_dir = None if args.no_cache else args.cache_dir
+    with contextlib.ExitStack() as stack:
+        profile_stream = sys.stderr
+        if args.profile_output:
+            profile_stream = stack.enter_context(
+                open(args.profile_output, "w", encoding="utf-8"))
+        sinks = ()
+        if args.profile == "jsonl":
+            sinks = (JsonLinesSink(profile_stream),)
+        elif args.profile == "table":
+            sinks = (TableSink(),)
+        # With --run, standard output belongs to the programs.
+        report = sys.stderr if args.run else sys.stdout
+        hits = misses = 0
+        for result in compile_files(files, args.target, cache_dir, jobs, args.lexer, args.stream,
+                                    sinks, write=not args.run or args.dump):
+            for message in result.messages:
+                print(message, file=report)
+            hits += result.cached is True
+            misses += result.cached is False
+            if args.run and result.ok:
+                run_target(result.target_code, result.filename.replace(".ec", ".py"))
+        if cache_dir is not None:
+            print(f"\nCache: {hits} hit(s), {misses} miss(es)", file=report)
+        if args.profile == "table":
+            print(sinks[0].render(), file=profile_stream)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,267 @@
+"""
+AST node classes built by the parser actions in parsey.py. Nodes use
+__slots__ and record the line and column (both 1-based) of the token they
+are reported at. The node kind is a class attribute, so it costs no memory
+per node and every node of a kind shares one interned string for the
+compiler passes to dispatch on.
+"""
+
+
+class Node:
+    __slots__ = ('line', 'col')
+    kind = None
+    fields = ()
+
+    def location(self, filename):
+        """The file:line:col prefix of diagnostics about this node."""
+        return f"{filename}:{self.line}:{self.col}"
+
+    def __reduce__(self):
+        # Pickle as constructor arguments rather than a dict of slot values.
+        return (type(self), tuple(getattr(self, field) for field in self.fields)
+                + (self.line, self.col))
+
+    def __eq__(self, other):
+        return (type(other) is type(self)
+                and all(getattr(self, field) == getattr(other, field) for field in self.fields))
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ", ".join(repr(getattr(self, field)) for field in self.fields)
+        return f"{type(self).__name__}({values})"
+
+
+def count_nodes(node):
+    """Number of nodes in the tree under node, counted without recursion."""
+    count = 0
+    pending = [node]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, Node):
+            count += 1
+            pending.extend(getattr(value, field) for field in value.fields)
+        elif type(value) is list:
+            pending.extend(value)
+    return count
+
+
+class Program(Node):
+    """The whole program: a list of statements."""
+    __slots__ = ('body',)
+    kind = 'program'
+    fields = __slots__
+
+    def __init__(self, body, line=0, col=0):
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class Assign(Node):
+    __slots__ = ('name', 'value')
+    kind = 'assign'
+    fields = __slots__
+
+    def __init__(self, name, value, line=0, col=0):
+        self.name = name
+        self.value = value
+        self.line = line
+        self.col = col
+
+
+class Number(Node):
+    __slots__ = ('value',)
+    kind = 'number'
+    fields = __slots__
+
+    def __init__(self, value, line=0, col=0):
+        self.value = value
+        self.line = line
+        self.col = col
+
+
+class String(Node):
+    """A string literal, escapes still undecoded."""
+    __slots__ = ('value',)
+    kind = 'string'
+    fields = __slots__
+
+    def __init__(self, value, line=0, col=0):
+        self.value = value
+        self.line = line
+        self.col = col
+
+
+class Var(Node):
+    __slots__ = ('name',)
+    kind = 'var'
+    fields = __slots__
+
+    def __init__(self, name, line=0, col=0):
+        self.name = name
+        self.line = line
+        self.col = col
+
+
+class BinOp(Node):
+    """An arithmetic operation; op is the EmoCode operator."""
+    __slots__ = ('op', 'left', 'right')
+    kind = 'binop'
+    fields = __slots__
+
+    def __init__(self, op, left, right, line=0, col=0):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.line = line
+        self.col = col
+
+
+class RelOp(Node):
+    __slots__ = ('op', 'left', 'right')
+    kind = 'relop'
+    fields = __slots__
+
+    def __init__(self, op, left, right, line=0, col=0):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.line = line
+        self.col = col
+
+
+class Print(Node):
+    __slots__ = ('value',)
+    kind = 'print'
+    fields = __slots__
+
+    def __init__(self, value, line=0, col=0):
+        self.value = value
+        self.line = line
+        self.col = col
+
+
+class Return(Node):
+    __slots__ = ('value',)
+    kind = 'return'
+    fields = __slots__
+
+    def __init__(self, value, line=0, col=0):
+        self.value = value
+        self.line = line
+        self.col = col
+
+
+class If(Node):
+    __slots__ = ('cond', 'body')
+    kind = 'if'
+    fields = __slots__
+
+    def __init__(self, cond, body, line=0, col=0):
+        self.cond = cond
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class IfElse(Node):
+    __slots__ = ('cond', 'body', 'orelse')
+    kind = 'if_else'
+    fields = __slots__
+
+    def __init__(self, cond, body, orelse, line=0, col=0):
+        self.cond = cond
+        self.body = body
+        self.orelse = orelse
+        self.line = line
+        self.col = col
+
+
+class While(Node):
+    __slots__ = ('cond', 'body')
+    kind = 'while'
+    fields = __slots__
+
+    def __init__(self, cond, body, line=0, col=0):
+        self.cond = cond
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class For(Node):
+    """A counting loop: init and update are Assign nodes run around body."""
+    __slots__ = ('init', 'cond', 'update', 'body')
+    kind = 'for'
+    fields = __slots__
+
+    def __init__(self, init, cond, update, body, line=0, col=0):
+        self.init = init
+        self.cond = cond
+        self.update = update
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class FunctionDef(Node):
+    __slots__ = ('name', 'params', 'body')
+    kind = 'function_def'
+    fields = __slots__
+
+    def __init__(self, name, params, body, line=0, col=0):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class ClassDef(Node):
+    __slots__ = ('name', 'body')
+    kind = 'class_def'
+    fields = __slots__
+
+    def __init__(self, name, body, line=0, col=0):
+        self.name = name
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class Call(Node):
+    """A call statement wrapping a CallFunction or CallMethod."""
+    __slots__ = ('call',)
+    kind = 'call'
+    fields = __slots__
+
+    def __init__(self, call, line=0, col=0):
+        self.call = call
+        self.line = line
+        self.col = col
+
+
+class CallFunction(Node):
+    __slots__ = ('name', 'args')
+    kind = 'call_function'
+    fields = __slots__
+
+    def __init__(self, name, args, line=0, col=0):
+        self.name = name
+        self.args = args
+        self.line = line
+        self.col = col
+
+
+class CallMethod(Node):
+    __slots__ = ('obj', 'method', 'args')
+    kind = 'call_method'
+    fields = __slots__
+
+    def __init__(self, obj, method, args, line=0, col=0):
+        self.obj = obj
+        self.method = method
+        self.args = args
+        self.line = line
+        self.col = col
@@ -1,86 +1,854 @@
-def optimize_intermediate_code(code):
+import operator
+from collections import deque
+
+from tac import (
+    Instr, Const, COPY, LABEL, PRINT, IF_FALSE, GOTO, RETURN, CALL, CALL_METHOD,
+    FUNCTION, END_FUNCTION, CLASS, END_CLASS, ARITHMETIC_OPS, RELATIONAL_OPS, BINARY_OPS,
+)
+
+
+# Python meaning of each EmoCode operator, used when both operands are constants.
+FOLDERS = {
+    '➕': operator.add,
+    '➖': operator.sub,
+    '✖️': operator.mul,
+    '➗': operator.floordiv,
+    '📈': operator.gt,
+    '📉': operator.lt,
+    '🟰': operator.eq,
+    '🚫🟰': operator.ne,
+    '📈🟰': operator.ge,
+    '📉🟰': operator.le,
+}
+
+
+# Largest results folded at compile time. Bigger ones are left for run
+# time rather than embedded in the target code as huge literals, which
+# Python may not even be able to write out (its int-to-str digit limit).
+FOLD_MAX_INT_BITS = 256
+FOLD_MAX_STRING_LENGTH = 256
+
+
+def fold_binary(op, left, right):
     """
-    Performs basic constant propagation and constant folding on the intermediate code.
-    :param code: List of TAC instructions (strings)
-    :return: List of optimized TAC instructions (strings)
+    Evaluates op over two Const operands at compile time. Returns the result
+    as a Const, or None when the operation is left for run time: mixed types,
+    arithmetic on strings other than concatenation, division by zero, or a
+    result beyond FOLD_MAX_INT_BITS or FOLD_MAX_STRING_LENGTH.
     """
-    constants = {}
-    optimized_code = []
+    kind = type(left.value)
+    if kind is not type(right.value):
+        return None
+    if kind is int:
+        if op == '➗' and right.value == 0:
+            return None
+    elif kind is str:
+        if op in ARITHMETIC_OPS and op != '➕':
+            return None
+    elif kind is bool:
+        if op not in ('🟰', '🚫🟰'):
+            return None
+    else:
+        return None
+    value = FOLDERS[op](left.value, right.value)
+    if type(value) is int and value.bit_length() > FOLD_MAX_INT_BITS:
+        return None
+    if type(value) is str and len(value) > FOLD_MAX_STRING_LENGTH:
+        return None
+    return Const(value)
+
+
+def build_blocks(code):
+    """
+    Splits a straight instruction list into basic blocks.
+    :return: (blocks, successors) where blocks is a list of (start, end)
+             index pairs and successors[b] lists the blocks control can
+             reach from block b.
+    """
+    leaders = {0}
+    for i, instr in enumerate(code):
+        if instr.op == LABEL:
+            leaders.add(i)
+        elif instr.op in (IF_FALSE, GOTO, RETURN):
+            leaders.add(i + 1)
+    starts = sorted(leader for leader in leaders if leader < len(code))
+    blocks = list(zip(starts, starts[1:] + [len(code)]))
+    block_of_label = {code[start].label: b for b, (start, _) in enumerate(blocks)
+                      if code[start].op == LABEL}
+
+    successors = []
+    for b, (start, end) in enumerate(blocks):
+        last = code[end - 1]
+        succ = []
+        if last.op in (GOTO, IF_FALSE):
+            succ.append(block_of_label[last.label])
+        if last.op not in (GOTO, RETURN) and b + 1 < len(blocks):
+            succ.append(b + 1)
+        successors.append(succ)
+    return blocks, successors
+
+
+def fold_instruction(instr, values, copy_sources=frozenset()):
+    """
+    Substitutes known values into the operands of instr and folds it if all
+    of them are constants (see fold_binary). values maps a name to the Const or the name it
+    currently equals and is updated in place with the effect of the
+    instruction; copy_sources are the names some copy may refer to.
+    Returns the rewritten instruction.
+    """
+    if instr.op in (LABEL, FUNCTION, CLASS):
+        return instr
+    args = tuple(values.get(arg, arg) if type(arg) is str else arg for arg in instr.args)
+    dest = instr.dest
+    if dest is not None:
+        value = None
+        if instr.op == COPY and args[0] != dest:
+            value = args[0]
+        elif instr.op in BINARY_OPS and type(args[0]) is Const and type(args[1]) is Const:
+            value = fold_binary(instr.op, args[0], args[1])
+        values.pop(dest, None)
+        if dest in copy_sources:
+            # Copies of the old value of dest are no longer valid.
+            for name in [name for name, source in values.items() if source == dest]:
+                del values[name]
+        if value is not None:
+            values[dest] = value
+            if instr.op != COPY:
+                return Instr(COPY, dest, (value,))
+    if args == instr.args:
+        return instr
+    return Instr(instr.op, dest, args, instr.label)
+
 
-    for line in code:
-        instr = line.strip()
-        
-        # If the line is a label, leave it unchanged.
-        if instr.endswith(':'):
-            optimized_code.append(instr)
+def _meet(states):
+    # Keeps only the facts every incoming path agrees on.
+    states = iter(states)
+    merged = dict(next(states))
+    for state in states:
+        for name in [name for name, value in merged.items() if state.get(name) != value]:
+            del merged[name]
+    return merged
+
+
+def _copy_sources(code, blocks, successors):
+    """
+    The names some copy refers to that may be redefined while a copy of
+    them is live. A name defined once, outside every backward jump's range
+    and before all of its copies (as the generated temporaries are) cannot
+    be, so its definition needs no scan for stale copies; this keeps long
+    bodies, such as a main with many inlined calls, linear.
+    """
+    definitions = {}
+    for i, instr in enumerate(code):
+        if instr.dest is not None:
+            definitions.setdefault(instr.dest, []).append(i)
+    in_loop = [False] * len(code)
+    for b, succ in enumerate(successors):
+        for s in succ:
+            if s <= b:
+                for i in range(blocks[s][0], blocks[b][1]):
+                    in_loop[i] = True
+    copy_sources = set()
+    for i, instr in enumerate(code):
+        if instr.op == COPY and type(instr.args[0]) is str:
+            name = instr.args[0]
+            defined = definitions.get(name, ())
+            if len(defined) > 1 or (defined and (in_loop[defined[0]] or i < defined[0])):
+                copy_sources.add(name)
+    return copy_sources
+
+
+def propagate_values(code):
+    """
+    Constant and copy propagation as one forward dataflow over the basic
+    blocks of a function, class or main body. A fact only survives a label
+    if it holds on every path into it, so values from one branch do not
+    leak past the join.
+    """
+    if not code:
+        return code
+    blocks, successors = build_blocks(code)
+    predecessors = [[] for _ in blocks]
+    for b, succ in enumerate(successors):
+        for s in succ:
+            predecessors[s].append(b)
+    copy_sources = _copy_sources(code, blocks, successors)
+
+    in_states = [None] * len(blocks)
+    out_states = [None] * len(blocks)
+    worklist = deque([0])
+    queued = {0}
+    while worklist:
+        b = worklist.popleft()
+        queued.discard(b)
+        if b == 0:
+            state = {}
+        else:
+            state = _meet(out_states[p] for p in predecessors[b] if out_states[p] is not None)
+            if in_states[b] is not None:
+                # Copy facts are not monotone (a = t may be a copy on one
+                # visit and a constant on the next), so a block only ever
+                # loses facts; otherwise loops can make this oscillate.
+                state = _meet((in_states[b], state))
+        in_states[b] = dict(state)
+        start, end = blocks[b]
+        for i in range(start, end):
+            fold_instruction(code[i], state, copy_sources)
+        if state != out_states[b]:
+            out_states[b] = state
+            for s in successors[b]:
+                if s not in queued:
+                    queued.add(s)
+                    worklist.append(s)
+
+    optimized_code = []
+    for b, (start, end) in enumerate(blocks):
+        if in_states[b] is None:
+            # Never reached from the entry; prune_unreachable drops it.
+            optimized_code.extend(code[start:end])
             continue
-        
-        # Skip optimization for call instructions.
-        if instr.startswith("call"):
-            optimized_code.append(instr)
+        state = dict(in_states[b])
+        for i in range(start, end):
+            optimized_code.append(fold_instruction(code[i], state, copy_sources))
+    return optimized_code
+
+
+def prune_unreachable(code):
+    """
+    Resolves ifFalse on literals, removes blocks that cannot be reached from
+    the entry, jumps to the next instruction and labels nobody jumps to.
+    Function and class headers are always kept.
+    """
+    resolved = []
+    for instr in code:
+        if instr.op == IF_FALSE and type(instr.args[0]) is Const:
+            if not instr.args[0].value:
+                resolved.append(Instr(GOTO, label=instr.label))
             continue
+        resolved.append(instr)
+    if not resolved:
+        return resolved
+
+    blocks, successors = build_blocks(resolved)
+    reachable = {0}
+    stack = [0]
+    while stack:
+        for s in successors[stack.pop()]:
+            if s not in reachable:
+                reachable.add(s)
+                stack.append(s)
+    kept = []
+    for b, (start, end) in enumerate(blocks):
+        if b in reachable:
+            kept.extend(resolved[start:end])
+        else:
+            kept.extend(instr for instr in resolved[start:end] if instr.op in (FUNCTION, CLASS))
 
-        # For control flow instructions, propagate constants.
-        if instr.startswith("ifFalse") or instr.startswith("goto") or instr.startswith("print"):
-            for var, const in constants.items():
-                instr = instr.replace(var, str(const))
-            optimized_code.append(instr)
+    pruned = []
+    for i, instr in enumerate(kept):
+        if instr.op in (GOTO, IF_FALSE):
+            j = i + 1
+            # Labels and nested definitions emit no code between the jump and its target.
+            while (j < len(kept) and kept[j].op in (LABEL, FUNCTION, CLASS)
+                   and kept[j].label != instr.label):
+                j += 1
+            if j < len(kept) and kept[j].op == LABEL:
+                continue
+        pruned.append(instr)
+    targets = {instr.label for instr in pruned if instr.op in (GOTO, IF_FALSE)}
+    return [instr for instr in pruned if instr.op != LABEL or instr.label in targets]
+
+
+def _is_removable(instr):
+    # Stores whose only effect is the assignment; a division may still raise.
+    if instr.op == COPY:
+        return True
+    if instr.op == '➗':
+        divisor = instr.args[1]
+        return type(divisor) is Const and divisor.value != 0
+    return instr.op in BINARY_OPS
+
+
+def _live_before(instr, live, call_live):
+    if instr.dest is not None:
+        live.discard(instr.dest)
+    live.update(instr.uses())
+    if instr.op in (CALL, CALL_METHOD):
+        live.update(call_live)
+
+
+def live_variables(code, call_live=frozenset()):
+    """
+    Backward liveness over the basic blocks of a body. Nothing is live at
+    the end of the body; call_live names are treated as read by every call.
+    :return: (blocks, successors, live_in) with blocks and successors as in
+             build_blocks and live_in[b] the names live on entry to block b.
+    """
+    blocks, successors = build_blocks(code)
+    live_in = [set() for _ in blocks]
+    changed = True
+    while changed:
+        changed = False
+        for b in reversed(range(len(blocks))):
+            live = set()
+            for s in successors[b]:
+                live |= live_in[s]
+            start, end = blocks[b]
+            for i in reversed(range(start, end)):
+                _live_before(code[i], live, call_live)
+            if live != live_in[b]:
+                live_in[b] = live
+                changed = True
+    return blocks, successors, live_in
+
+
+def eliminate_dead_stores(code, call_live=frozenset()):
+    """
+    Liveness-based dead-store elimination. Nothing is live at the end of a
+    body; call_live names are treated as read by every call (main-program
+    variables that function bodies may read).
+    """
+    if not code:
+        return code
+    blocks, successors, live_in = live_variables(code, call_live)
+
+    optimized_code = []
+    for b, (start, end) in enumerate(blocks):
+        live = set()
+        for s in successors[b]:
+            live |= live_in[s]
+        kept = []
+        for i in reversed(range(start, end)):
+            instr = code[i]
+            if instr.dest is not None and instr.dest not in live and _is_removable(instr):
+                continue
+            _live_before(instr, live, call_live)
+            kept.append(instr)
+        optimized_code.extend(reversed(kept))
+    return optimized_code
+
+
+# Loops are unrolled completely when their trip count is known and at most
+# UNROLL_MAX_TRIPS, and the unrolled body has at most UNROLL_MAX_INSTRUCTIONS.
+UNROLL_MAX_TRIPS = 8
+UNROLL_MAX_INSTRUCTIONS = 64
+
+# Prefix of the variables strength reduction introduces. EmoCode names
+# cannot contain '_', so these never clash with a program's own.
+REDUCED_PREFIX = "_sr"
+
+_CONTROL_OPS = (LABEL, GOTO, IF_FALSE, RETURN, FUNCTION, CLASS)
+
+
+def find_loops(code):
+    """
+    Finds the loops of a body: a label and a later goto back to it, as
+    intermediate.py emits for 🔁 and ➿. Loops entered other than through
+    their head, or holding nested definitions, are left out.
+    :return: (head, back) index pairs of the label and the goto,
+             innermost loops first.
+    """
+    position = {}
+    loops = []
+    jumps = []
+    for i, instr in enumerate(code):
+        if instr.op == LABEL:
+            position[instr.label] = i
+        elif instr.op in (GOTO, IF_FALSE):
+            jumps.append((i, instr.label))
+            if instr.op == GOTO and instr.label in position:
+                loops.append((position[instr.label], i))
+    single_entry = []
+    for head, back in loops:
+        inside = {code[i].label for i in range(head, back) if code[i].op == LABEL}
+        if any(label in inside and not head < i <= back for i, label in jumps):
             continue
+        if any(code[i].op in (FUNCTION, CLASS) for i in range(head, back)):
+            continue
+        single_entry.append((head, back))
+    single_entry.sort(key=lambda loop: loop[1] - loop[0])
+    return single_entry
+
+
+def _induction_step(code, lo, hi, name):
+    """
+    If the only assignment to name in code[lo:hi] adds a constant to it,
+    either directly or through a temporary (t = name ➕ c; name = t),
+    returns (index of that assignment, step). Otherwise returns None.
+    """
+    defs = [i for i in range(lo, hi) if code[i].dest == name]
+    if len(defs) != 1:
+        return None
+    update = code[defs[0]]
+    if update.op == COPY and type(update.args[0]) is str:
+        temp = update.args[0]
+        temp_defs = [i for i in range(lo, hi) if code[i].dest == temp]
+        if len(temp_defs) != 1 or temp_defs[0] > defs[0]:
+            return None
+        update = code[temp_defs[0]]
+    if update.op not in ('➕', '➖'):
+        return None
+    left, right = update.args
+    if left == name and type(right) is Const and type(right.value) is int:
+        return defs[0], right.value if update.op == '➕' else -right.value
+    if update.op == '➕' and right == name and type(left) is Const and type(left.value) is int:
+        return defs[0], left.value
+    return None
+
+
+def unroll_loop(code, head, back):
+    """
+    Replaces the loop at code[head:back + 1] by copies of its body when it
+    counts a variable from a constant to a constant bound: its condition
+    compares the variable with an integer literal, the variable is set to
+    an integer literal just before the loop and the straight-line body
+    steps it by a constant (see _induction_step).
+    :return: the new code, or None if the loop does not qualify.
+    """
+    if back + 1 >= len(code) or code[back + 1].op != LABEL or head + 3 > back:
+        return None
+    cond, branch = code[head + 1], code[head + 2]
+    if (cond.op not in RELATIONAL_OPS or branch.op != IF_FALSE
+            or branch.label != code[back + 1].label or branch.args[0] != cond.dest):
+        return None
+    body = code[head + 3:back]
+    if any(instr.op in _CONTROL_OPS for instr in body):
+        return None
+    left, right = cond.args
+    if type(left) is str and type(right) is Const:
+        name, bound = left, right.value
+    elif type(right) is str and type(left) is Const:
+        name, bound = right, left.value
+    else:
+        return None
+    if type(bound) is not int or cond.dest == name:
+        return None
+    induction = _induction_step(code, head + 3, back, name)
+    if induction is None:
+        return None
+    step = induction[1]
+
+    start = None
+    for i in reversed(range(head)):
+        instr = code[i]
+        if instr.op in _CONTROL_OPS:
+            return None
+        if instr.dest == name:
+            if instr.op == COPY and type(instr.args[0]) is Const:
+                start = instr.args[0].value
+            break
+    if type(start) is not int:
+        return None
 
-        # Process assignment instructions.
-        if '=' in instr:
-            left, right = instr.split('=', 1)
-            left = left.strip()
-            right = right.strip()
-
-            # Try to evaluate a direct integer assignment.
-            try:
-                value = int(right)
-                constants[left] = value
-                optimized_code.append(f"{left} = {value}")
+    compare = FOLDERS[cond.op]
+    value, trips = start, 0
+    while compare(value, bound) if left == name else compare(bound, value):
+        trips += 1
+        if trips > UNROLL_MAX_TRIPS:
+            return None
+        value += step
+    if trips * len(body) > UNROLL_MAX_INSTRUCTIONS:
+        return None
+    # The condition is evaluated once more, as the loop would on exit.
+    return code[:head] + body * trips + [cond] + code[back + 1:]
+
+
+def hoist_invariants(code, head, back, call_live=frozenset()):
+    """
+    Loop-invariant code motion: moves the assignments of the loop at
+    code[head:back + 1] whose operands the loop never changes in front of
+    it. Only side-effect-free assignments (see _is_removable) to names
+    assigned once in the loop, not live on entry to it and not live after
+    it are moved, so running them when the loop body would not run is
+    harmless.
+    :return: the new code, or None if nothing can be moved.
+    """
+    blocks, successors, live_in = live_variables(code, call_live)
+    in_loop = {b for b, (start, _) in enumerate(blocks) if head <= start <= back}
+    header = next(b for b, (start, _) in enumerate(blocks) if start == head)
+    live_after = set()
+    for b in in_loop:
+        for s in successors[b]:
+            if s not in in_loop:
+                live_after |= live_in[s]
+    blocked = live_in[header] | live_after
+
+    defs = {}
+    for i in range(head + 1, back):
+        dest = code[i].dest
+        if dest is not None:
+            defs[dest] = defs.get(dest, 0) + 1
+    hoisted = []
+    moved = set()
+    changed = True
+    while changed:
+        changed = False
+        for i in range(head + 1, back):
+            instr = code[i]
+            if (i in moved or instr.dest is None or not _is_removable(instr)
+                    or defs[instr.dest] != 1 or instr.dest in blocked):
+                continue
+            if any(type(arg) is str and defs.get(arg) for arg in instr.args):
+                continue
+            # Operands of later candidates may now be invariant too.
+            moved.add(i)
+            hoisted.append(instr)
+            defs[instr.dest] = 0
+            changed = True
+    if not hoisted:
+        return None
+    loop = [code[i] for i in range(head, back + 1) if i not in moved]
+    return code[:head] + hoisted + loop + code[back + 1:]
+
+
+def reduce_strength(code, head, back):
+    """
+    Strength reduction on induction variables: every product i ✖️ k of an
+    induction variable i of the loop at code[head:back + 1] (see
+    _induction_step) and an integer literal k is replaced by a new
+    variable set to i ✖️ k before the loop and stepped by step ✖️ k right
+    after each update of i.
+    :return: the new code, or None if the loop has no such product.
+    """
+    lo, hi = head + 1, back
+    reduced = {}        # (i, k) -> (new variable, index of the update of i, step)
+    replaced = {}       # index of a product -> its (i, k)
+    counter = max((int(instr.dest[len(REDUCED_PREFIX):]) for instr in code
+                   if instr.dest is not None and instr.dest.startswith(REDUCED_PREFIX)),
+                  default=0)
+    for i in range(lo, hi):
+        instr = code[i]
+        if instr.op != '✖️':
+            continue
+        left, right = instr.args
+        if type(left) is str and type(right) is Const:
+            key = (left, right.value)
+        elif type(right) is str and type(left) is Const:
+            key = (right, left.value)
+        else:
+            continue
+        if type(key[1]) is not int or instr.dest == key[0]:
+            continue
+        if key not in reduced:
+            induction = _induction_step(code, lo, hi, key[0])
+            if induction is None:
                 continue
-            except ValueError:
-                pass
-
-            # Check for binary operations.
-            for op in ['➕', '➖', '✖️', '➗']:
-                if op in right:
-                    op_parts = right.split(op)
-                    if len(op_parts) == 2:
-                        op1 = op_parts[0].strip()
-                        op2 = op_parts[1].strip()
-                        if op1 in constants:
-                            op1 = str(constants[op1])
-                        if op2 in constants:
-                            op2 = str(constants[op2])
-                        try:
-                            num1 = int(op1)
-                            num2 = int(op2)
-                            if op == '➕':
-                                result = num1 + num2
-                            elif op == '➖':
-                                result = num1 - num2
-                            elif op == '✖️':
-                                result = num1 * num2
-                            elif op == '➗':
-                                result = num1 // num2
-                            constants[left] = result
-                            optimized_code.append(f"{left} = {result}")
-                            break
-                        except ValueError:
-                            new_right = f"{op1} {op} {op2}"
-                            optimized_code.append(f"{left} = {new_right}")
-                            break
+            counter += 1
+            reduced[key] = (f"{REDUCED_PREFIX}{counter}",) + induction
+        replaced[i] = key
+    if not replaced:
+        return None
+
+    preheader = [Instr('✖️', name, (var, Const(k))) for (var, k), (name, _, _) in reduced.items()]
+    updates = {}
+    for (var, k), (name, update, step) in reduced.items():
+        updates.setdefault(update, []).append(Instr('➕', name, (name, Const(step * k))))
+    loop = [code[head]]
+    for i in range(lo, hi):
+        if i in replaced:
+            loop.append(Instr(COPY, code[i].dest, (reduced[replaced[i]][0],)))
+        else:
+            loop.append(code[i])
+        loop.extend(updates.get(i, ()))
+    loop.append(code[back])
+    return code[:head] + preheader + loop + code[back + 1:]
+
+
+def optimize_loops(code, call_live=frozenset()):
+    """
+    Applies one loop transformation, trying the innermost loops first:
+    unrolling, then invariant code motion, then strength reduction.
+    Returns code unchanged when no loop can be improved.
+    """
+    for head, back in find_loops(code):
+        for transform in (unroll_loop, hoist_invariants, reduce_strength):
+            if transform is hoist_invariants:
+                new_code = transform(code, head, back, call_live)
+            else:
+                new_code = transform(code, head, back)
+            if new_code is not None:
+                return new_code
+    return code
+
+
+# Prefix of the names and labels inlining introduces (see REDUCED_PREFIX),
+# followed by the number of the inlined call and '_'.
+INLINED_PREFIX = "_il"
+INLINE_MAX_INSTRUCTIONS = 32
+
+
+def _assigned(body):
+    return {instr.dest for instr in body if instr.dest is not None}
+
+
+def _free_names(params, body):
+    # Names a function body reads without defining them: main-program variables.
+    local = set(params) | _assigned(body)
+    return {name for instr in body for name in instr.uses() if name not in local}
+
+
+def _block_end(code, start):
+    # Index of the END_FUNCTION/END_CLASS closing the block opened at start.
+    depth = 0
+    for i in range(start, len(code)):
+        if code[i].op in (FUNCTION, CLASS):
+            depth += 1
+        elif code[i].op in (END_FUNCTION, END_CLASS):
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError("unterminated definition")
+
+
+def _top_level_functions(code):
+    """
+    The functions defined directly in the main program and only once in the
+    whole program: name -> (parameters, index of FUNCTION, index of END_FUNCTION).
+    """
+    definitions = {}
+    for instr in code:
+        if instr.op == FUNCTION:
+            definitions[instr.label] = definitions.get(instr.label, 0) + 1
+    found = {}
+    i = 0
+    while i < len(code):
+        instr = code[i]
+        if instr.op in (FUNCTION, CLASS):
+            end = _block_end(code, i)
+            if instr.op == FUNCTION:
+                found[instr.label] = (instr.args, i, end)
+            i = end
+        i += 1
+    return {name: entry for name, entry in found.items() if definitions[name] == 1}
+
+
+def _is_inlinable(params, body):
+    """
+    Whether a function body can replace its calls: it fits the budget,
+    defines nothing, returns at most once, at its end, and never reads a
+    local of its own before assigning it (it would read a main-program
+    variable of that name instead).
+    """
+    if len(body) > INLINE_MAX_INSTRUCTIONS or len(set(params)) != len(params):
+        return False
+    if any(instr.op in (FUNCTION, CLASS) for instr in body):
+        return False
+    returns = [i for i, instr in enumerate(body) if instr.op == RETURN]
+    if returns and returns != [len(body) - 1]:
+        return False
+    if not body:
+        return True
+    _, _, live_in = live_variables(body)
+    return not live_in[0] & (_assigned(body) - set(params))
+
+
+def _expand_call(args, params, body, prefix):
+    # The body with its parameters and locals renamed, fed the arguments and
+    # printing its result as a call statement does.
+    rename = {name: prefix + name for name in set(params) | _assigned(body)}
+    expanded = [Instr(COPY, rename[param], (arg,)) for param, arg in zip(params, args)]
+    for instr in body:
+        operands = tuple(rename.get(arg, arg) if type(arg) is str else arg for arg in instr.args)
+        if instr.op == RETURN:
+            expanded.append(Instr(PRINT, None, (Const("Function returned:"),) + operands))
+            return expanded
+        dest = None if instr.dest is None else rename.get(instr.dest, instr.dest)
+        label = prefix + instr.label if instr.op in (LABEL, GOTO, IF_FALSE) else instr.label
+        expanded.append(Instr(instr.op, dest, operands, label))
+    expanded.append(Instr(PRINT, None, (Const("Function returned: None"),)))
+    return expanded
+
+
+def _inline_calls(body, inlinable, local_names, counter):
+    """
+    Replaces the calls in body of the functions in inlinable (name ->
+    (parameters, body, free names)). A call is kept when the callee reads a
+    main-program variable that local_names, the locals of body, would shadow.
+    """
+    inlined = []
+    for instr in body:
+        entry = inlinable.get(instr.label) if instr.op == CALL else None
+        if entry is None or len(instr.args) != len(entry[0]) or entry[2] & local_names:
+            inlined.append(instr)
+            continue
+        counter[0] += 1
+        inlined.extend(_expand_call(instr.args, entry[0], entry[1],
+                                    f"{INLINED_PREFIX}{counter[0]}_"))
+    return inlined
+
+
+def _post_order(calls):
+    # Functions ordered callees first; cycles are cut where they close.
+    order = []
+    seen = set()
+    for root in calls:
+        if root in seen:
+            continue
+        seen.add(root)
+        stack = [(root, iter(sorted(calls[root])))]
+        while stack:
+            name, callees = stack[-1]
+            for callee in callees:
+                if callee not in seen:
+                    seen.add(callee)
+                    stack.append((callee, iter(sorted(calls[callee]))))
+                    break
             else:
-                for var, const in constants.items():
-                    if var in right:
-                        right = right.replace(var, str(const))
-                optimized_code.append(f"{left} = {right}")
+                stack.pop()
+                order.append(name)
+    return order
+
+
+def _reaches(calls, start, target):
+    pending = list(calls[start])
+    seen = set(pending)
+    while pending:
+        name = pending.pop()
+        if name == target:
+            return True
+        for callee in calls[name]:
+            if callee not in seen:
+                seen.add(callee)
+                pending.append(callee)
+    return False
+
+
+def inline_functions(code):
+    """
+    Substitutes the bodies of small, non-recursive functions (see
+    _is_inlinable and INLINE_MAX_INSTRUCTIONS) for their call statements in
+    the main program, in functions and in methods, with the callee's
+    parameters, locals and labels renamed apart. Functions are inlined into
+    each other callees first, so a call chain can collapse entirely. The
+    definitions stay in place; the later passes fold the copied arguments
+    into the inlined code.
+    """
+    functions = _top_level_functions(code)
+    if not functions:
+        return code
+    bodies = {name: code[start + 1:end] for name, (_, start, end) in functions.items()}
+    calls = {name: {instr.label for instr in body
+                    if instr.op == CALL and instr.label in functions}
+             for name, body in bodies.items()}
+    counter = [max((int(name[len(INLINED_PREFIX):].split("_", 1)[0]) for instr in code
+                    for name in (instr.dest, instr.label)
+                    if type(name) is str and name.startswith(INLINED_PREFIX)), default=0)]
+
+    inlinable = {}
+    for name in _post_order(calls):
+        params, body = functions[name][0], bodies[name]
+        if not any(instr.op in (FUNCTION, CLASS) for instr in body):
+            body = bodies[name] = _inline_calls(body, inlinable, set(params) | _assigned(body),
+                                                counter)
+        if not _reaches(calls, name, name) and _is_inlinable(params, body):
+            inlinable[name] = (params, body, _free_names(params, body))
+    if not inlinable:
+        return code
+
+    inlined = []
+    open_blocks = []
+    i = 0
+    while i < len(code):
+        instr = code[i]
+        if instr.op == FUNCTION and open_blocks in ([], [CLASS]):
+            end = _block_end(code, i)
+            if not open_blocks and instr.label in functions:
+                body = bodies[instr.label]
+            else:
+                body = code[i + 1:end]
+                if not any(nested.op in (FUNCTION, CLASS) for nested in body):
+                    body = _inline_calls(body, inlinable, set(instr.args) | _assigned(body),
+                                         counter)
+            inlined.append(instr)
+            inlined.extend(body)
+            inlined.append(code[end])
+            i = end + 1
+            continue
+        if instr.op in (FUNCTION, CLASS):
+            open_blocks.append(instr.op)
+        elif instr.op in (END_FUNCTION, END_CLASS):
+            open_blocks.pop()
+        elif instr.op == CALL and not open_blocks:
+            inlined.extend(_inline_calls((instr,), inlinable, frozenset(), counter))
+            i += 1
             continue
+        inlined.append(instr)
+        i += 1
+    return inlined
+
+
+def _optimize_body(code, call_live):
+    # Each pass exposes work for the others; run them until nothing changes.
+    while True:
+        optimized_code = propagate_values(code)
+        optimized_code = prune_unreachable(optimized_code)
+        optimized_code = eliminate_dead_stores(optimized_code, call_live)
+        optimized_code = optimize_loops(optimized_code, call_live)
+        if optimized_code == code:
+            return optimized_code
+        code = optimized_code
+
+
+def _optimize_region(code, pos, end_op, call_live=frozenset()):
+    """
+    Optimizes the instructions up to end_op as one unit. Nested function and
+    class blocks are optimized on their own and stay opaque here: their
+    header instruction stands in for the whole block.
+    """
+    body = []
+    nested = {}
+    while pos < len(code):
+        instr = code[pos]
+        pos += 1
+        if instr.op == end_op:
+            break
+        body.append(instr)
+        if instr.op in (FUNCTION, CLASS):
+            block_end = END_FUNCTION if instr.op == FUNCTION else END_CLASS
+            nested[id(instr)], pos = _optimize_region(code, pos, block_end)
 
-        for var, const in constants.items():
-            if var in instr:
-                instr = instr.replace(var, str(const))
+    optimized_code = []
+    for instr in _optimize_body(body, call_live):
         optimized_code.append(instr)
+        if id(instr) in nested:
+            optimized_code.extend(nested[id(instr)])
+            optimized_code.append(Instr(END_FUNCTION if instr.op == FUNCTION else END_CLASS))
+    return optimized_code, pos
+
+
+def names_read_by_definitions(code):
+    """
+    Free names of the function and class bodies of code, i.e. main-program
+    variables they may read once hoisted to module level: the names live on
+    entry to a body, less its parameters. A name the body also assigns still
+    counts when some path reads it first.
+    """
+    names = set()
+    scopes = []
+    for instr in code:
+        if instr.op in (FUNCTION, CLASS):
+            scopes.append((instr.args, []))
+        elif instr.op in (END_FUNCTION, END_CLASS):
+            params, body = scopes.pop()
+            if body:
+                names |= live_variables(body)[2][0] - set(params)
+        elif scopes:
+            scopes[-1][1].append(instr)
+    return frozenset(names)
+
 
+def optimize_intermediate_code(code, inline=True):
+    """
+    Performs function inlining (see inline_functions; skipped without
+    inline, so that every call stays visible to a profiler), constant and copy
+    propagation, constant folding, unreachable code removal, dead-store
+    elimination and the loop optimizations of optimize_loops (unrolling,
+    invariant code motion, strength reduction) on the intermediate code.
+    Every function, class and main body is optimized separately.
+    :param code: List of TAC instructions (tac.Instr)
+    :return: List of optimized TAC instructions (tac.Instr)
+    """
+    if inline:
+        code = inline_functions(code)
+    optimized_code, _ = _optimize_region(code, 0, None, names_read_by_definitions(code))
     return optimized_code
@@ -1,5 +1,22 @@
+import importlib
+import os
+import sys
+import zlib
+
 import ply.yacc as yacc
-from lexy import tokens
+import lexy
+from lexy import tokens, new_lexer
+from fastlex import FastLexer
+from nodes import (
+    Program, Assign, Number, String, Var, BinOp, RelOp, Print, Return, If, IfElse,
+    While, For, FunctionDef, ClassDef, Call, CallFunction, CallMethod,
+)
+
+# Lexer engines parse() can run the grammar on; both produce the tokens of lexy.py.
+LEXERS = {
+    "ply": new_lexer,
+    "fast": FastLexer,
+}
 
 precedence = (
     ('left', 'PLUS', 'MINUS'),
@@ -7,13 +24,20 @@ precedence = (
     ('left', 'GT', 'LT', 'EQUAL', 'LE', 'GE', 'NE'),
 )
 
+def _at(p, n):
+    """(line, col) of token n of the rule being reduced, both 1-based."""
+    line = p.lineno(n)
+    return line, p.lexpos(n) - p.lexer.line_starts[line] + 1
+
 def p_program(p):
     '''program : statement_list'''
-    p[0] = ('program', p[1])
+    first = p[1][0]
+    p[0] = Program(p[1], first.line, first.col)
 
 def p_statement_list_multiple(p):
     '''statement_list : statement_list statement'''
-    p[0] = p[1] + [p[2]]
+    p[1].append(p[2])
+    p[0] = p[1]
 
 def p_statement_list_single(p):
     '''statement_list : statement'''
@@ -21,15 +45,16 @@ def p_statement_list_single(p):
 
 def p_statement_class(p):
     '''statement : CLASS VAR OPEN_BRACE statement_list CLOSE_BRACE'''
-    p[0] = ('class_def', p[2], p[4])
+    p[0] = ClassDef(p[2], p[4], *_at(p, 1))
 
 def p_statement_function(p):
     '''statement : FUNCTION VAR OPEN_PAREN parameter_list CLOSE_PAREN OPEN_BRACE statement_list CLOSE_BRACE'''
-    p[0] = ('function_def', p[2], p[4], p[7])
+    p[0] = FunctionDef(p[2], p[4], p[7], *_at(p, 1))
 
 def p_parameter_list_multiple(p):
     '''parameter_list : parameter_list COMMA VAR'''
-    p[0] = p[1] + [p[3]]
+    p[1].append(p[3])
+    p[0] = p[1]
 
 def p_parameter_list_single(p):
     '''parameter_list : VAR'''
@@ -41,48 +66,58 @@ def p_parameter_list_empty(p):
 
 def p_statement_assign(p):
     '''statement : VAR ASSIGN expression SEMICOLON'''
-    p[0] = ('assign', p[1], p[3])
+    p[0] = Assign(p[1], p[3], *_at(p, 1))
 
 def p_statement_print(p):
     '''statement : PRINT OPEN_PAREN expression CLOSE_PAREN SEMICOLON'''
-    p[0] = ('print', p[3])
+    p[0] = Print(p[3], *_at(p, 1))
 
 def p_statement_return(p):
     '''statement : RETURN expression SEMICOLON'''
-    p[0] = ('return', p[2])
+    p[0] = Return(p[2], *_at(p, 1))
 
 def p_statement_if_else(p):
     '''statement : IF OPEN_PAREN expression CLOSE_PAREN OPEN_BRACE statement_list CLOSE_BRACE ELSE OPEN_BRACE statement_list CLOSE_BRACE'''
-    p[0] = ('if_else', p[3], p[6], p[10])
+    p[0] = IfElse(p[3], p[6], p[10], *_at(p, 1))
 
 def p_statement_if(p):
     '''statement : IF OPEN_PAREN expression CLOSE_PAREN OPEN_BRACE statement_list CLOSE_BRACE'''
-    p[0] = ('if', p[3], p[6])
+    p[0] = If(p[3], p[6], *_at(p, 1))
+
+def p_statement_while(p):
+    '''statement : WHILE OPEN_PAREN expression CLOSE_PAREN OPEN_BRACE statement_list CLOSE_BRACE'''
+    p[0] = While(p[3], p[6], *_at(p, 1))
+
+def p_statement_for(p):
+    '''statement : FOR OPEN_PAREN VAR ASSIGN expression SEMICOLON expression SEMICOLON VAR ASSIGN expression CLOSE_PAREN OPEN_BRACE statement_list CLOSE_BRACE'''
+    p[0] = For(Assign(p[3], p[5], *_at(p, 3)), p[7], Assign(p[9], p[11], *_at(p, 9)), p[14],
+               *_at(p, 1))
 
 # Call statement grammar
 def p_statement_call(p):
     '''statement : CALL call_expr SEMICOLON'''
-    p[0] = ('call', p[2])
+    p[0] = Call(p[2], *_at(p, 1))
 
 def p_call_expr_method(p):
     '''call_expr : VAR DOT VAR'''
-    p[0] = ('call_method', p[1], p[3], [])
+    p[0] = CallMethod(p[1], p[3], [], *_at(p, 1))
 
 def p_call_expr_method_args(p):
     '''call_expr : VAR DOT VAR OPEN_PAREN arg_list CLOSE_PAREN'''
-    p[0] = ('call_method', p[1], p[3], p[5])
+    p[0] = CallMethod(p[1], p[3], p[5], *_at(p, 1))
 
 def p_call_expr_function(p):
     '''call_expr : VAR OPEN_PAREN arg_list CLOSE_PAREN'''
-    p[0] = ('call_function', p[1], p[3])
+    p[0] = CallFunction(p[1], p[3], *_at(p, 1))
 
 def p_call_expr_function_empty(p):
     '''call_expr : VAR OPEN_PAREN CLOSE_PAREN'''
-    p[0] = ('call_function', p[1], [])
+    p[0] = CallFunction(p[1], [], *_at(p, 1))
 
 def p_arg_list_multiple(p):
     '''arg_list : arg_list COMMA expression'''
-    p[0] = p[1] + [p[3]]
+    p[1].append(p[3])
+    p[0] = p[1]
 
 def p_arg_list_single(p):
     '''arg_list : expression'''
@@ -93,7 +128,7 @@ def p_expression_binop(p):
                   | expression MINUS expression
                   | expression MULT expression
                   | expression DIV expression'''
-    p[0] = ('binop', p[2], p[1], p[3])
+    p[0] = BinOp(p[2], p[1], p[3], *_at(p, 2))
 
 def p_expression_relop(p):
     '''expression : expression GT expression
@@ -102,7 +137,7 @@ def p_expression_relop(p):
                   | expression LE expression
                   | expression GE expression
                   | expression NE expression'''
-    p[0] = ('relop', p[2], p[1], p[3])
+    p[0] = RelOp(p[2], p[1], p[3], *_at(p, 2))
 
 def p_expression_group(p):
     '''expression : OPEN_PAREN expression CLOSE_PAREN'''
@@ -110,15 +145,15 @@ def p_expression_group(p):
 
 def p_expression_number(p):
     '''expression : NUMBER'''
-    p[0] = ('number', p[1])
+    p[0] = Number(p[1], *_at(p, 1))
 
 def p_expression_string(p):
     '''expression : STRING'''
-    p[0] = ('string', p[1])
+    p[0] = String(p[1], *_at(p, 1))
 
 def p_expression_var(p):
     '''expression : VAR'''
-    p[0] = ('var', p[1])
+    p[0] = Var(p[1], *_at(p, 1))
 
 def p_error(p):
     if p:
@@ -126,4 +161,93 @@ def p_error(p):
     else:
         print("Syntax error at EOF")
 
-parser = yacc.yacc()
+def grammar_hash():
+    """Fingerprint of the grammar. parsetab.py records it to detect stale tables."""
+    module = sys.modules[__name__]
+    text = [repr((tokens, precedence))]
+    for name in sorted(vars(module)):
+        if name.startswith('p_') and name != 'p_error':
+            text.append(f"{name}={getattr(module, name).__doc__}")
+    return format(zlib.crc32("\n".join(text).encode()), "08x")
+
+def build_tables():
+    """
+    Regenerates the frozen tables lextab.py and parsetab.py next to this
+    module. Run `python parsey.py` after changing tokens or grammar rules.
+    """
+    outputdir = os.path.dirname(os.path.abspath(__file__))
+    lexy.build_table(outputdir)
+    # Make yacc regenerate parsetab.py even if the current one looks valid.
+    sys.modules.pop('parsetab', None)
+    table_path = os.path.join(outputdir, 'parsetab.py')
+    if os.path.exists(table_path):
+        os.remove(table_path)
+    importlib.invalidate_caches()
+    yacc.yacc(module=sys.modules[__name__], tabmodule='parsetab', outputdir=outputdir,
+              debug=False, write_tables=True)
+    with open(table_path, 'a') as table_file:
+        table_file.write(f"_emocode_grammar_hash = {grammar_hash()!r}\n")
+
+def _load_frozen_parser():
+    try:
+        import parsetab
+    except ImportError:
+        return None
+    if getattr(parsetab, '_emocode_grammar_hash', None) != grammar_hash():
+        return None
+    table = yacc.LRTable()
+    try:
+        table.read_table(parsetab)
+    except yacc.VersionError:
+        return None
+    table.bind_callables(globals())
+    return yacc.LRParser(table, p_error)
+
+_parser = None
+
+def get_parser():
+    """
+    Returns the shared parser, created on first use. It is loaded straight
+    from the frozen parsetab.py with no grammar validation; if that table is
+    missing or stale the tables are generated in memory instead. Nothing is
+    written to disk either way.
+    """
+    global _parser
+    if _parser is None:
+        _parser = _load_frozen_parser() or yacc.yacc(module=sys.modules[__name__],
+                                                     debug=False, write_tables=False)
+    return _parser
+
+def __getattr__(name):
+    # The module-level 'parser' is only built when somebody asks for it.
+    if name == 'parser':
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def parse(source_code, lexer="ply", first_line=1, counts=None, first_col=1):
+    """
+    Parses one program with its own lexer so no state carries over between
+    compilations. lexer names the engine in LEXERS. Node positions are
+    counted from first_line and, on that line, first_col, for sources that
+    are a piece of a larger file. If counts is a dict, counts['tokens'] is
+    increased by the tokens read.
+    """
+    engine = LEXERS[lexer]()
+    engine.lineno = first_line
+    # A negative start puts the columns of the first line after first_col - 1
+    # characters of the larger file.
+    engine.line_starts = {first_line: 1 - first_col}
+    if counts is not None:
+        next_token = engine.token
+        counts.setdefault('tokens', 0)
+
+        def counted_token():
+            token = next_token()
+            if token is not None:
+                counts['tokens'] += 1
+            return token
+        engine.token = counted_token
+    return get_parser().parse(source_code, lexer=engine)
+
+if __name__ == '__main__':
+    build_tables()
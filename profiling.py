@@ -0,0 +1,113 @@
+"""
+Per-stage instrumentation of a compilation. A Profiler times the stages
+wrapped in its stage() context manager and records for each the wall
+time, the peak memory allocated while it ran (through tracemalloc) and
+whatever counts the caller attaches (tokens, nodes, instructions, ...).
+
+main.compile_files hands the records of every file to sinks: any
+callable taking a StageRecord. JsonLinesSink and TableSink cover the
+command line; other metric systems plug in with a function of their own.
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageRecord:
+    """Measurements of one stage of compiling one file."""
+    __slots__ = ("file", "stage", "seconds", "peak_bytes", "counts")
+
+    def __init__(self, file, stage, seconds=0.0, peak_bytes=None, counts=None):
+        self.file = file
+        self.stage = stage
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+        self.counts = {} if counts is None else counts
+
+    def add(self, **counts):
+        """Adds to the counts of this record."""
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def to_dict(self):
+        return {"file": self.file, "stage": self.stage, "seconds": self.seconds,
+                "peak_bytes": self.peak_bytes, **self.counts}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        return cls(data.pop("file"), data.pop("stage"), data.pop("seconds"),
+                   data.pop("peak_bytes"), data)
+
+
+class Profiler:
+    """
+    Collects the StageRecords of one file in self.records, in the order
+    the stages first ran. A stage entered again (a streamed compilation
+    parses once per segment) adds to its earlier record: the times and
+    counts are summed and the peak is the highest one seen. With memory,
+    tracemalloc is started if it is not running already; it slows
+    allocation-heavy code down noticeably.
+    """
+
+    def __init__(self, file, memory=True):
+        self.file = file
+        self.memory = memory
+        self.records = []
+        self._by_stage = {}
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measures the with block as stage name. Yields the stage's
+        StageRecord so the block can record counts with add(). Stages
+        should not be nested: each one resets the tracemalloc peak.
+        """
+        record = self._by_stage.get(name)
+        if record is None:
+            record = self._by_stage[name] = StageRecord(self.file, name)
+            self.records.append(record)
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds += time.perf_counter() - started
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                record.peak_bytes = max(record.peak_bytes or 0, peak)
+
+
+class JsonLinesSink:
+    """Writes every record it is given to stream as one line of JSON."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, record):
+        self.stream.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+
+
+class TableSink:
+    """Collects the records it is given; render() formats them as a table."""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def render(self):
+        lines = [f"{'file':24s}{'stage':10s}{'time':>11s}{'peak mem':>12s}  counts"]
+        for record in self.records:
+            peak = "" if record.peak_bytes is None else f"{record.peak_bytes / 1024:9.1f} KiB"
+            counts = ", ".join(f"{key}={value}" for key, value in record.counts.items())
+            lines.append(f"{record.file:24s}{record.stage:10s}"
+                         f"{record.seconds * 1000:9.2f}ms{peak:>12s}  {counts}")
+        return "\n".join(lines)
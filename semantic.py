@@ -1,137 +1,230 @@
-class SemanticAnalyzer:
-    def __init__(self):
-        self.symbol_table = {}
+from visitor import Visitor
+
+
+class Scope:
+    """
+    One level of the symbol table: the symbols defined directly in a
+    global, class or function body, chained to the enclosing scope.
+    Entering and leaving a body costs O(1) whatever the number of symbols
+    around it.
+    """
+    __slots__ = ("kind", "name", "parent", "symbols")
+
+    def __init__(self, kind, name=None, parent=None):
+        self.kind = kind
+        self.name = name
+        self.parent = parent
+        self.symbols = {}
+
+    def define(self, name, symbol_type):
+        self.symbols[name] = symbol_type
+
+    def lookup(self, name):
+        """
+        Resolves name from this scope outwards.
+        :return: (symbol_type, defining_scope), or (None, None) if undefined.
+        """
+        scope = self
+        while scope is not None:
+            if name in scope.symbols:
+                return scope.symbols[name], scope
+            scope = scope.parent
+        return None, None
+
+    def __repr__(self):
+        return f"Scope({self.kind!r}, {self.name!r})"
+
+
+class SemanticAnalyzer(Visitor):
+    """
+    Checks names and types. Each diagnostic starts with the file:line:col
+    of the node it is about; filename is the file reported there.
+    """
+
+    def __init__(self, filename="<input>"):
+        self.filename = filename
+        self.global_scope = Scope('global')
+        self.scope = self.global_scope
         self.errors = []
+        # Functions and methods live apart from variables, as in the
+        # runtime: name -> parameter count, (class, method) -> parameter count.
+        self.functions = {}
+        self.methods = {}
 
-    def analyze(self, node):
-        if node is None:
-            return
-
-        node_type = node[0]
-
-        if node_type == 'program':
-            for stmt in node[1]:
-                self.analyze(stmt)
-
-        elif node_type == 'assign':
-            var_name = node[1]
-            expr = node[2]
-            expr_type = self.analyze(expr)
-            self.symbol_table[var_name] = expr_type
-            return expr_type
+    def error(self, node, message):
+        self.errors.append(f"{node.location(self.filename)}: {message}")
 
-        elif node_type == 'number':
-            return 'number'
-
-        elif node_type == 'string':
+    def analyze(self, node):
+        """Checks node and returns its type ('number', 'string', ...), if any."""
+        return self.visit(node)
+
+    def analyze_body(self, scope, statements):
+        """Analyzes statements with scope as the current scope."""
+        enclosing = self.scope
+        self.scope = scope
+        for stmt in statements:
+            yield stmt
+        self.scope = enclosing
+
+    def visit_program(self, node):
+        for stmt in node.body:
+            yield stmt
+
+    def visit_assign(self, node):
+        expr_type = yield node.value
+        self.scope.define(node.name, expr_type)
+        return expr_type
+
+    def visit_number(self, node):
+        return 'number'
+
+    def visit_string(self, node):
+        return 'string'
+
+    def visit_var(self, node):
+        var_type, defining_scope = self.scope.lookup(node.name)
+        if defining_scope is None:
+            self.error(node, f"Undefined variable: {node.name}")
+        return var_type
+
+    def visit_binop(self, node):
+        left_type = yield node.left
+        right_type = yield node.right
+        if node.op == '➕' and left_type == 'string' and right_type == 'string':
             return 'string'
-
-        elif node_type == 'var':
-            var_name = node[1]
-            if var_name not in self.symbol_table:
-                self.errors.append(f"Undefined variable: {var_name}")
-                return None
-            return self.symbol_table[var_name]
-
-        elif node_type == 'binop':
-            left_type = self.analyze(node[2])
-            right_type = self.analyze(node[3])
-            if left_type != 'number' or right_type != 'number':
-                self.errors.append(f"Type error in binary operation: {node}")
-                return None
-            return 'number'
-
-        elif node_type == 'relop':
-            left_type = self.analyze(node[2])
-            right_type = self.analyze(node[3])
-            if left_type != right_type:
-                self.errors.append(f"Type mismatch in relational operation: {node}")
-            return 'boolean'
-
-        elif node_type == 'if_else':
-            self.analyze(node[1])
-            for stmt in node[2]:
-                self.analyze(stmt)
-            for stmt in node[3]:
-                self.analyze(stmt)
-
-        elif node_type == 'if':
-            self.analyze(node[1])
-            for stmt in node[2]:
-                self.analyze(stmt)
-
-        elif node_type == 'print':
-            self.analyze(node[1])
+        if left_type != 'number' or right_type != 'number':
+            self.error(node, f"Type error in binary operation {node.op}: "
+                             f"{left_type} and {right_type}")
             return None
+        return 'number'
+
+    def visit_relop(self, node):
+        left_type = yield node.left
+        right_type = yield node.right
+        if left_type != right_type:
+            self.error(node, f"Type mismatch in relational operation {node.op}: "
+                             f"{left_type} and {right_type}")
+        return 'boolean'
+
+    def visit_if_else(self, node):
+        yield node.cond
+        for stmt in node.body:
+            yield stmt
+        for stmt in node.orelse:
+            yield stmt
+
+    def visit_if(self, node):
+        yield node.cond
+        for stmt in node.body:
+            yield stmt
+
+    def visit_while(self, node):
+        yield node.cond
+        for stmt in node.body:
+            yield stmt
+
+    def visit_for(self, node):
+        yield node.init
+        yield node.cond
+        for stmt in node.body:
+            yield stmt
+        yield node.update
+
+    def visit_print(self, node):
+        yield node.value
+        return None
 
-        elif node_type == 'return':
-            return self.analyze(node[1])
-
-        elif node_type == 'function_def':
-            func_name = node[1]
-            self.symbol_table[func_name] = 'function'
-            local_symbols = {}
-            for param in node[2]:
-                local_symbols[param] = 'number'
-            old_table = self.symbol_table.copy()
-            self.symbol_table.update(local_symbols)
-            for stmt in node[3]:
-                self.analyze(stmt)
-            self.symbol_table = old_table
-
-        elif node_type == 'class_def':
-            class_name = node[1]
-            self.symbol_table[class_name] = 'class'
-            for stmt in node[2]:
-                self.analyze(stmt)
-
-        # New support for call nodes:
-        elif node_type == 'call':
-            # A generic call node that wraps a call expression.
-            self.analyze(node[1])
-            return None
+    def visit_return(self, node):
+        return (yield node.value)
 
-        elif node_type == 'call_function':
-            # For function calls: ('call_function', function_name, arg_list)
-            func_name = node[1]
-            if func_name not in self.symbol_table:
-                self.errors.append(f"Undefined function: {func_name}")
-            for arg in node[2]:
-                self.analyze(arg)
-            return None
+    def visit_function_def(self, node):
+        self.scope.define(node.name, 'function')
+        if len(set(node.params)) != len(node.params):
+            self.error(node, f"Duplicate parameter in function {node.name}")
+        if self.scope.kind == 'class':
+            self.check_redefinition(node, self.methods, (self.scope.name, node.name),
+                                    f"Method {self.scope.name}.{node.name}")
+        else:
+            self.check_redefinition(node, self.functions, node.name, f"Function {node.name}")
+        # As in Python, a class body is not visible from the functions
+        # defined in it, so their scope chains past it.
+        parent = self.scope
+        while parent.kind == 'class':
+            parent = parent.parent
+        function_scope = Scope('function', node.name, parent)
+        for param in node.params:
+            function_scope.define(param, 'number')
+        yield from self.analyze_body(function_scope, node.body)
+
+    def visit_class_def(self, node):
+        self.scope.define(node.name, 'class')
+        yield from self.analyze_body(Scope('class', node.name, self.scope), node.body)
+
+    def visit_call(self, node):
+        # A call statement wraps a CallFunction or CallMethod.
+        yield node.call
+        return None
 
-        elif node_type == 'call_method':
-            # For method calls: ('call_method', object_name, method_name, arg_list)
-            obj_name = node[1]
-            method_name = node[2]
-            if obj_name not in self.symbol_table:
-                self.errors.append(f"Undefined object: {obj_name}")
-            for arg in node[3]:
-                self.analyze(arg)
-            return None
+    def check_redefinition(self, node, definitions, key, description):
+        # Every call runs the last definition, so all of them take the same
+        # number of arguments.
+        count = definitions.setdefault(key, len(node.params))
+        if count != len(node.params):
+            self.error(node, f"{description} redefined with {len(node.params)} "
+                             f"parameter(s) instead of {count}")
+
+    def check_arguments(self, node, count, description):
+        if count != len(node.args):
+            self.error(node, f"{description} expects {count} argument(s), "
+                             f"got {len(node.args)}")
+
+    def visit_call_function(self, node):
+        if node.name not in self.functions:
+            self.error(node, f"Undefined function: {node.name}")
+        else:
+            self.check_arguments(node, self.functions[node.name], f"Function {node.name}")
+        for arg in node.args:
+            yield arg
+        return None
 
+    def visit_call_method(self, node):
+        if self.scope.lookup(node.obj)[1] is None:
+            self.error(node, f"Undefined object: {node.obj}")
+        elif (node.obj, node.method) not in self.methods:
+            self.error(node, f"Undefined method: {node.obj}.{node.method}")
         else:
-            self.errors.append(f"Unknown node type: {node_type}")
+            self.check_arguments(node, self.methods[(node.obj, node.method)],
+                                 f"Method {node.obj}.{node.method}")
+        for arg in node.args:
+            yield arg
+        return None
 
+    def generic_visit(self, node):
+        self.error(node, f"Unknown node type: {node.kind}")
         return None
 
 if __name__ == '__main__':
-    parsed_ast = ('program', [
-        ('class_def', '🚗', [
-            ('function_def', '🚦', [], [('print', ('string', 'Car is moving'))])
+    from nodes import (
+        Program, Assign, Number, String, Var, BinOp, RelOp, Print, Return, IfElse,
+        FunctionDef, ClassDef, Call, CallFunction, CallMethod,
+    )
+
+    parsed_ast = Program([
+        ClassDef('🚗', [
+            FunctionDef('🚦', [], [Print(String('Car is moving'))])
         ]),
-        ('function_def', 'add', ['😀', '🔥'], [
-            ('assign', '💰', ('binop', '➕', ('var', '😀'), ('var', '🔥'))),
-            ('return', ('var', '💰'))
+        FunctionDef('add', ['😀', '🔥'], [
+            Assign('💰', BinOp('➕', Var('😀'), Var('🔥'))),
+            Return(Var('💰'))
         ]),
-        ('assign', '😀', ('number', 5)),
-        ('assign', '🔥', ('number', 10)),
-        ('if_else', ('relop', '📈', ('var', '😀'), ('var', '🔥')),
-            [('print', ('string', '😀 is greater'))],
-            [('print', ('string', '🔥 is greater'))]
+        Assign('😀', Number(5)),
+        Assign('🔥', Number(10)),
+        IfElse(RelOp('📈', Var('😀'), Var('🔥')),
+            [Print(String('😀 is greater'))],
+            [Print(String('🔥 is greater'))]
         ),
-        ('call', ('call_function', 'add', [('var', '😀'), ('var', '🔥')])),
-        ('call', ('call_method', '🚗', '🚦', []))
+        Call(CallFunction('add', [Var('😀'), Var('🔥')])),
+        Call(CallMethod('🚗', '🚦', []))
     ])
 
     analyzer = SemanticAnalyzer()
@@ -0,0 +1,271 @@
+"""
+Long-lived compile server. It imports the compiler once, so the PLY
+tables, the lexer and the compile cache stay loaded, and serves compile
+requests over a Unix socket. With --watch it also polls a directory and
+recompiles every .ec file that changes, streaming the results to the
+clients that watch.
+
+Usage:
+    python server.py serve [--watch DIR] [--target T] ...   # start the server
+    python server.py compile FILE...                        # compile through it
+    python server.py watch                                  # follow the watcher
+    python server.py stop
+
+The protocol is JSON lines: a client sends one request, e.g.
+{"op": "compile", "files": [...], "target": "compiled"}, and the server
+answers with one line per file ({"filename", "ok", "messages", "cached"})
+and then {"done": true}. A watch request is answered with a line per
+recompiled file until the client disconnects.
+
+The client commands only use the standard library: the compiler modules
+are imported by serve, so a client starts in a few milliseconds.
+"""
+
+import argparse
+import glob
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+
+DEFAULT_SOCKET = ".emocode.sock"
+
+
+def result_to_dict(result):
+    return {"filename": result.filename, "ok": result.ok, "messages": result.messages,
+            "cached": result.cached}
+
+
+class Watcher:
+    """Finds the .ec files of a directory that are new or changed since the last scan."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.stamps = {}
+
+    def changes(self):
+        stamps = {}
+        for filename in glob.glob(os.path.join(self.directory, "*.ec")):
+            try:
+                info = os.stat(filename)
+            except OSError:
+                continue
+            stamps[filename] = (info.st_mtime_ns, info.st_size)
+        changed = sorted(name for name, stamp in stamps.items()
+                         if self.stamps.get(name) != stamp)
+        self.stamps = stamps
+        return changed
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def send(self, message):
+        self.wfile.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            self.send({"error": "malformed request"})
+            return
+        op = request.get("op")
+        try:
+            if op == "compile":
+                for filename in request.get("files", ()):
+                    self.send(self.server.compile(filename, request.get("target")))
+                self.send({"done": True})
+            elif op == "watch":
+                self.follow()
+            elif op == "stop":
+                self.send({"done": True})
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                self.send({"error": f"unknown request {op!r}"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def follow(self):
+        results = self.server.subscribe()
+        try:
+            while True:
+                self.send(results.get())
+        finally:
+            self.server.unsubscribe(results)
+
+
+class CompileServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves compile requests on socket_path with main.process_file. PLY's
+    parser state and the captured standard output are shared by the whole
+    process, so compilations run one at a time under self.lock.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path, target="compiled", cache_dir=".emocode_cache", lexer="ply",
+                 stream=False):
+        # The compiler is imported here, once per server, rather than by clients.
+        from main import process_file
+        from compile_cache import CompileCache
+        self.process_file = process_file
+        self.target = target
+        self.cache = None if cache_dir is None else CompileCache(cache_dir)
+        self.lexer = lexer
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.subscribers_lock = threading.Lock()
+        self._stopped = threading.Event()
+        super().__init__(socket_path, _RequestHandler)
+
+    def compile(self, filename, target=None):
+        """Compiles filename and returns its result as a dict."""
+        with self.lock:
+            try:
+                result = self.process_file(filename, target or self.target, self.cache,
+                                           self.lexer, self.stream)
+            except Exception as error:
+                # A failing compilation must not take the server down.
+                return {"filename": filename, "ok": False, "cached": None,
+                        "messages": [f"\nProcessing {filename} ...",
+                                     f"Internal compiler error: {error!r}"]}
+        return result_to_dict(result)
+
+    def subscribe(self):
+        results = queue.Queue()
+        with self.subscribers_lock:
+            self.subscribers.add(results)
+        return results
+
+    def unsubscribe(self, results):
+        with self.subscribers_lock:
+            self.subscribers.discard(results)
+
+    def publish(self, result):
+        with self.subscribers_lock:
+            for results in self.subscribers:
+                results.put(result)
+
+    def watch(self, directory, interval=0.2):
+        """
+        Polls directory every interval seconds, recompiling new and changed
+        .ec files; prints their diagnostics and publishes the results to
+        the watching clients. Runs until the server shuts down.
+        """
+        watcher = Watcher(directory)
+        while not self._stopped.wait(interval):
+            for filename in watcher.changes():
+                result = self.compile(filename)
+                for message in result["messages"]:
+                    print(message, flush=True)
+                self.publish(result)
+
+    def serve_forever(self, poll_interval=0.5):
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self._stopped.set()
+
+
+def _remove_stale_socket(socket_path):
+    # A socket file left by a server that died would make bind() fail.
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(socket_path)
+            return
+    raise SystemExit(f"A compile server is already listening on {socket_path}")
+
+
+def serve(socket_path, watch=None, interval=0.2, **options):
+    """Runs a CompileServer on socket_path until it is stopped."""
+    _remove_stale_socket(socket_path)
+    with CompileServer(socket_path, **options) as server:
+        if watch is not None:
+            threading.Thread(target=server.watch, args=(watch, interval), daemon=True).start()
+        print(f"EmoCode compile server listening on {socket_path}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+def request(socket_path, message):
+    """Sends message to the server on socket_path and yields its answers."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as answers:
+            for line in answers:
+                answer = json.loads(line)
+                if answer.get("done"):
+                    return
+                if "error" in answer:
+                    raise RuntimeError(answer["error"])
+                yield answer
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="EmoCode compile server")
+    arg_parser.add_argument("--socket", default=DEFAULT_SOCKET,
+                            help=f"Unix socket of the server (default: {DEFAULT_SOCKET})")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the server")
+    serve_parser.add_argument("--watch", metavar="DIR",
+                              help="recompile the .ec files of DIR when they change")
+    serve_parser.add_argument("--interval", type=float, default=0.2,
+                              help="seconds between two scans of the watched directory")
+    serve_parser.add_argument("--target",
+                              choices=("compiled", "interpreter", "profile", "binary"),
+                              default="compiled")
+    serve_parser.add_argument("--cache-dir", default=".emocode_cache",
+                              help="directory of the incremental compilation cache")
+    serve_parser.add_argument("--no-cache", action="store_true",
+                              help="always compile every file from scratch")
+    serve_parser.add_argument("--lexer", choices=("ply", "fast"), default="ply")
+    serve_parser.add_argument("--stream", action="store_true",
+                              help="read sources in chunks and compile them statement by "
+                                   "statement")
+    compile_parser = commands.add_parser("compile", help="compile files through the server")
+    compile_parser.add_argument("files", nargs="+")
+    compile_parser.add_argument("--target",
+                                choices=("compiled", "interpreter", "profile", "binary"),
+                                help="target to compile for (default: the server's)")
+    commands.add_parser("watch", help="print the results of the server's watcher")
+    commands.add_parser("stop", help="shut the server down")
+    args = arg_parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.socket, args.watch, args.interval, target=args.target,
+              cache_dir=None if args.no_cache else args.cache_dir, lexer=args.lexer,
+              stream=args.stream)
+        return
+    if args.command == "compile":
+        message = {"op": "compile", "target": args.target,
+                   "files": [os.path.abspath(filename) for filename in args.files]}
+    else:
+        message = {"op": args.command}
+    ok = True
+    try:
+        for result in request(args.socket, message):
+            for line in result["messages"]:
+                print(line, flush=True)
+            ok = ok and result["ok"]
+    except (ConnectionRefusedError, FileNotFoundError):
+        sys.exit(f"No compile server is listening on {args.socket}")
+    except KeyboardInterrupt:
+        pass
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Streamed reading of EmoCode sources: read_chunks decodes a file piece by
+piece and split_statements cuts the text between top-level statements, so
+the front end (parser, semantic analysis, TAC generation) only ever holds
+one segment of text and its AST. The TAC of the whole program is still
+built before optimization and code generation, which need all of it: the
+optimizer inlines functions and follows main variables into the bodies
+that read them, and the generators emit the definitions ahead of main. A
+streamed compilation therefore still needs memory in proportion to the
+program's TAC, only not to its text or AST.
+"""
+
+import codecs
+import io
+import mmap
+import re
+from functools import partial
+
+import lexy
+
+CHUNK_SIZE = 1 << 16
+
+# Characters that can start or end a top-level statement, or hide one of
+# those inside a string, comment or parentheses (the header of a ➿ loop).
+_SIGNIFICANT = re.compile(r'[{}();"#]')
+_STRING = re.compile(lexy.t_STRING.__doc__)
+# Whitespace and complete comments between a closing brace and the next token.
+_SKIP = re.compile(r'(?:[ \t\n]+|#[^\n]*\n)*')
+_BLANK = re.compile(r'(?:[ \t\n]+|#[^\n]*)*\Z')
+
+
+def read_chunks(filename, chunk_size=CHUNK_SIZE, use_mmap=True):
+    """
+    Yields the text of filename in pieces of about chunk_size bytes without
+    ever holding the whole file. The file is memory-mapped when possible and
+    read in blocks otherwise. Decoding is incremental, so a UTF-8 sequence
+    split between two pieces comes out whole, and newlines are translated
+    as open() does in text mode.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(), translate=True)
+    with open(filename, "rb") as source_file:
+        mapped = None
+        if use_mmap:
+            try:
+                mapped = mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                pass  # Empty files, pipes and the like cannot be mapped.
+        if mapped is not None:
+            with mapped:
+                for offset in range(0, len(mapped), chunk_size):
+                    text = decoder.decode(mapped[offset:offset + chunk_size])
+                    if text:
+                        yield text
+        else:
+            for block in iter(partial(source_file.read, chunk_size), b""):
+                text = decoder.decode(block)
+                if text:
+                    yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def _scan(text, pos, depth, final):
+    """
+    Continues scanning text from pos at nesting depth depth (braces and
+    parentheses). Returns (pos, depth, cut): how far the scan got, the
+    depth there and the end of the last complete top-level statement seen
+    (0 if none). The scan stops
+    early at a string, comment or closing brace whose meaning depends on
+    text that has not arrived yet, unless final says no more will.
+    """
+    cut = 0
+    while True:
+        match = _SIGNIFICANT.search(text, pos)
+        if match is None:
+            return len(text), depth, cut
+        pos = match.start()
+        char = text[pos]
+        if char == '"':
+            string = _STRING.match(text, pos)
+            if string:
+                pos = string.end()
+                continue
+            if not final and text.find('\n', pos) < 0:
+                return pos, depth, cut
+            pos += 1  # A stray quote; the lexer reports it and goes on after it.
+        elif char == '#':
+            newline = text.find('\n', pos)
+            if newline < 0:
+                return (len(text) if final else pos), depth, cut
+            pos = newline
+        elif char == '{' or char == '(':
+            depth += 1
+            pos += 1
+        elif char == ')':
+            depth = max(depth - 1, 0)
+            pos += 1
+        elif char == ';':
+            pos += 1
+            if depth == 0:
+                cut = pos
+        elif depth == 1:
+            # The closing brace of an if statement is only its end if no 🔄 follows.
+            after = _SKIP.match(text, pos + 1).end()
+            if not final and (after == len(text) or text[after] == '#'):
+                return pos, depth, cut
+            depth = 0
+            pos += 1
+            if not text.startswith(lexy.t_ELSE, after):
+                cut = pos
+        else:
+            depth = max(depth - 1, 0)
+            pos += 1
+
+
+def split_statements(chunks):
+    """
+    Regroups text chunks into segments that each hold one or more complete
+    top-level statements, so every segment parses as a program of its own.
+    A segment is yielded as soon as the chunk completing it arrives. Text
+    after the last complete statement is yielded at the end if it holds
+    anything but whitespace and comments (for the parser to report), as is
+    the whole text when it has no statement at all.
+    """
+    buffer = ""
+    pos = depth = 0
+    emitted = False
+    for chunk in chunks:
+        buffer += chunk
+        pos, depth, cut = _scan(buffer, pos, depth, False)
+        if cut:
+            yield buffer[:cut]
+            emitted = True
+            buffer = buffer[cut:]
+            pos -= cut
+    _, _, cut = _scan(buffer, pos, depth, True)
+    if cut:
+        yield buffer[:cut]
+        emitted = True
+        buffer = buffer[cut:]
+    if not emitted or not _BLANK.match(buffer):
+        yield buffer
+
+
+def stream_statements(filename, chunk_size=CHUNK_SIZE, use_mmap=True):
+    """Source segments of filename ending on top-level statement boundaries."""
+    return split_statements(read_chunks(filename, chunk_size, use_mmap))
@@ -0,0 +1,124 @@
+"""
+Three-address code (TAC) records shared by the IR generator, the optimizer
+and the code generators. Text is only produced by format_code() for
+debugging; no stage parses it back.
+"""
+
+# Opcodes. Binary instructions use the EmoCode operator itself as opcode.
+LABEL = 'label'                # label = name
+COPY = 'copy'                  # dest = args[0]
+PRINT = 'print'                # print *args  (separated by spaces)
+IF_FALSE = 'ifFalse'           # ifFalse args[0] goto label
+GOTO = 'goto'                  # goto label
+RETURN = 'return'              # return args[0]
+CALL = 'call'                  # call label(*args)
+CALL_METHOD = 'call_method'    # call label[0].label[1](*args)
+FUNCTION = 'function'          # function label(*args):  (args are parameter names)
+END_FUNCTION = 'end function'
+CLASS = 'class'                # class label:
+END_CLASS = 'end class'
+
+ARITHMETIC_OPS = ('➕', '➖', '✖️', '➗')
+RELATIONAL_OPS = ('📈', '📉', '🟰', '🚫🟰', '📈🟰', '📉🟰')
+BINARY_OPS = frozenset(ARITHMETIC_OPS + RELATIONAL_OPS)
+
+
+def is_program_name(name):
+    """
+    Whether name is a variable of the source program. The names the
+    compiler introduces (temporaries and the variables of optimizer.py)
+    contain '_', which EmoCode identifiers cannot.
+    """
+    return "_" not in name
+
+
+class Const:
+    """A literal operand. Plain str operands always name a variable or temporary."""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return (type(other) is Const and type(other.value) is type(self.value)
+                and other.value == self.value)
+
+    def __hash__(self):
+        return hash((type(self.value), self.value))
+
+    def __repr__(self):
+        return f"Const({self.value!r})"
+
+    def __str__(self):
+        if isinstance(self.value, str):
+            escaped = self.value.replace('\\', '\\\\').replace('"', '\\"')
+            return f'"{escaped}"'
+        return str(self.value)
+
+
+class Instr:
+    """One TAC instruction: opcode, destination, operand tuple and label/symbol."""
+    __slots__ = ('op', 'dest', 'args', 'label')
+
+    def __init__(self, op, dest=None, args=(), label=None):
+        self.op = op
+        self.dest = dest
+        self.args = args
+        self.label = label
+
+    def uses(self):
+        """Names read by this instruction."""
+        if self.op == FUNCTION:
+            return ()
+        return tuple(arg for arg in self.args if type(arg) is str)
+
+    def __eq__(self, other):
+        return (type(other) is Instr and self.op == other.op and self.dest == other.dest
+                and self.args == other.args and self.label == other.label)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Instr({self.op!r}, {self.dest!r}, {self.args!r}, {self.label!r})"
+
+    def __str__(self):
+        return format_instr(self)
+
+
+def format_instr(instr):
+    op = instr.op
+    args = [str(arg) for arg in instr.args]
+    if op in BINARY_OPS:
+        return f"{instr.dest} = {args[0]} {op} {args[1]}"
+    if op == COPY:
+        return f"{instr.dest} = {args[0]}"
+    if op == LABEL:
+        return f"{instr.label}:"
+    if op == IF_FALSE:
+        return f"ifFalse {args[0]} goto {instr.label}"
+    if op == GOTO:
+        return f"goto {instr.label}"
+    if op in (PRINT, RETURN):
+        return f"{op} {' '.join(args)}"
+    if op == CALL:
+        return f"call {instr.label}({', '.join(args)})"
+    if op == CALL_METHOD:
+        return f"call {instr.label[0]}.{instr.label[1]}({', '.join(args)})"
+    if op == FUNCTION:
+        return f"function {instr.label}({', '.join(args)}):"
+    if op == CLASS:
+        return f"class {instr.label}:"
+    return op
+
+
+def format_code(code):
+    """Renders a TAC list as indented text lines (debugging aid)."""
+    lines = []
+    depth = 0
+    for instr in code:
+        if instr.op in (END_FUNCTION, END_CLASS):
+            depth -= 1
+        lines.append("    " * depth + format_instr(instr))
+        if instr.op in (FUNCTION, CLASS):
+            depth += 1
+    return lines
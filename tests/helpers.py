@@ -0,0 +1,33 @@
+"""
+Shared scaffolding of the tests: puts the compiler on sys.path and runs
+EmoCode programs in-process on every target that executes them.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import emocode
+
+TARGETS = ("compiled", "interpreter", "binary")
+
+
+def run_output(source, target="compiled"):
+    """What source prints when it is compiled for target and run in-process."""
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        emocode.run(source, target=target)
+    return output.getvalue()
+
+
+class ProgramTestCase(unittest.TestCase):
+
+    def check(self, source, expected, targets=TARGETS):
+        """Asserts that source prints expected on every target of targets."""
+        for target in targets:
+            with self.subTest(target=target):
+                self.assertEqual(run_output(source, target), expected)
@@ -0,0 +1,120 @@
+"""
+Regression tests of the compiled target: programs that pass semantic
+analysis must print what the interpreter prints, and the ones it cannot
+express must be rejected before code generation.
+"""
+
+import unittest
+
+from helpers import ProgramTestCase
+
+import emocode
+from codegen import generate_compiled_code
+from emocode import CompileError, translate
+
+
+class CompiledMatchesInterpreter(ProgramTestCase):
+
+    def test_function_reads_then_assigns_main_variable(self):
+        source = ("x = 5;\n"
+                  "🎭 bump(n) {\n"
+                  "    ➿ (i = 0; i 📉 n; i = i ➕ 1) {\n"
+                  "        x = x ➕ 1;\n"
+                  "    }\n"
+                  "    🖨️(x);\n"
+                  "}\n"
+                  "call bump(3);\n"
+                  "🖨️(x);\n")
+        self.check(source, "8\nFunction returned: None\n5\n")
+
+    def test_class_body_statements_do_not_run(self):
+        source = ("🏛 A {\n"
+                  "    🖨️(\"in class\");\n"
+                  "    🎭 m() {\n"
+                  "        🖨️(\"m\");\n"
+                  "    }\n"
+                  "}\n"
+                  "call A.m;\n")
+        self.check(source, "m\n")
+
+    def test_variables_do_not_shadow_functions_and_classes(self):
+        source = ("🎭 f() {\n"
+                  "    🖨️(\"f\");\n"
+                  "}\n"
+                  "🏛 A {\n"
+                  "    🎭 m() {\n"
+                  "        🖨️(\"m\");\n"
+                  "    }\n"
+                  "}\n"
+                  "🎭 g() {\n"
+                  "    🖨️(f);\n"
+                  "    🖨️(A);\n"
+                  "}\n"
+                  "f = 3;\n"
+                  "A = 4;\n"
+                  "call g();\n"
+                  "call f();\n"
+                  "call A.m;\n")
+        self.check(source, "3\n4\nFunction returned: None\nf\nFunction returned: None\nm\n")
+
+    def test_temporaries_are_not_globals(self):
+        source = ("s = 0;\n"
+                  "➿ (i = 0; i 📉 100; i = i ➕ 1) {\n"
+                  "    s = s ➕ i;\n"
+                  "}\n"
+                  "🖨️(s);\n")
+        _, optimized_code, _ = translate((source,), "<test>", [])
+        target_code = generate_compiled_code(optimized_code)
+        self.assertIn("v__t", target_code)
+        self.assertIn("    global v_i, v_s\n", target_code)
+        self.check(source, "4950\n")
+
+
+class UnassignedNamesPrintThemselves(ProgramTestCase):
+    """A variable read before any assignment evaluates to its own name."""
+
+    def test_branch_not_taken(self):
+        self.check("y = 0;\n🤔 (y 📈 2) {\n    x = 1;\n}\n🖨️(x);\n", "x\n")
+
+    def test_loop_body_not_run(self):
+        source = ("➿ (i = 0; i 📉 0; i = i ➕ 1) {\n"
+                  "    x = i;\n"
+                  "}\n"
+                  "🖨️(x);\n")
+        self.check(source, "x\n")
+
+    def test_function_reads_main_variable_not_yet_assigned(self):
+        source = ("y = 0;\n"
+                  "🤔 (y 📈 2) {\n"
+                  "    x = 1;\n"
+                  "}\n"
+                  "🎭 show() {\n"
+                  "    🖨️(x);\n"
+                  "}\n"
+                  "call show();\n"
+                  "x = 1;\n"
+                  "call show();\n")
+        self.check(source, "x\nFunction returned: None\n1\nFunction returned: None\n")
+
+
+class RejectedCalls(unittest.TestCase):
+
+    def check_error(self, source, message):
+        with self.assertRaises(CompileError) as raised:
+            emocode.compile_source(source)
+        self.assertIn(message, str(raised.exception))
+
+    def test_undefined_method(self):
+        self.check_error("🏛 A {\n    🎭 m() {\n        🖨️(1);\n    }\n}\ncall A.z;\n",
+                         "Undefined method: A.z")
+
+    def test_argument_count(self):
+        self.check_error("🎭 f(a, b) {\n    🔙 a;\n}\ncall f(1);\n",
+                         "Function f expects 2 argument(s), got 1")
+
+    def test_call_of_a_variable(self):
+        self.check_error("x = 1;\ncall x();\n", "Undefined function: x")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""FastLexer must produce the token stream of the PLY lexer."""
+
+import os
+import unittest
+
+from helpers import ROOT
+
+from fastlex import FastLexer
+from lexy import new_lexer
+
+SOURCES = {
+    "operators": ("a = 1 ➕ 2 ➖ 3 ✖️ 4 ➗ 5;\n"
+                  "🤔 (a 📈🟰 b) { x = a 🚫🟰 b; } 🔄 { x = a 📉🟰 b; }\n"
+                  "🤔 (a 📈 b) { x = a 📉 b; }\n"
+                  "🤔 (a 🟰 b) { 🖨️(\"x \\\"quoted\\\" y\"); }\n"),
+    "loops": ("# a comment\n"
+              "➿ (i = 0; i 📉 3; i = i ➕ 1) { 🔁 (j 📉 i) { j = j ➕ 1; } }\n"),
+    "definitions": ("🏛 🚗 { 🎭 🚦(😀, 🔥) { 💰 = 😀 ➕ 🔥; 🔙 💰; } }\n"
+                    "call 🚗.🚦(1, 2);\ncall f(x1, y2);\n"),
+}
+
+
+def tokens(lexer, source):
+    lexer.input(source)
+    return [(tok.type, tok.value, tok.lineno, tok.lexpos) for tok in iter(lexer.token, None)]
+
+
+class FastLexerMatchesPly(unittest.TestCase):
+
+    def check(self, source):
+        expected = tokens(new_lexer(), source)
+        self.assertTrue(expected)
+        self.assertEqual(tokens(FastLexer(), source), expected)
+
+    def test_sources(self):
+        for name, source in SOURCES.items():
+            with self.subTest(source=name):
+                self.check(source)
+
+    def test_example_program(self):
+        with open(os.path.join(ROOT, "test.ec"), "r", encoding="utf-8") as source_file:
+            self.check(source_file.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
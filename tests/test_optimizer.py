@@ -0,0 +1,166 @@
+"""
+Regression tests of the optimizer: optimized programs must print what the
+unoptimized interpreter prints.
+"""
+
+import contextlib
+import io
+import unittest
+
+from helpers import ProgramTestCase
+
+import emocode
+from emocode import translate
+from optimizer import FOLD_MAX_INT_BITS, FOLD_MAX_STRING_LENGTH
+from tac import CALL, Const
+
+
+class MainVariablesReadByFunctions(ProgramTestCase):
+    """Stores of main-program variables a function reads must survive."""
+
+    def test_read_before_write(self):
+        source = ("x = 5;\n"
+                  "🎭 show() {\n"
+                  "    🖨️(x);\n"
+                  "    x = 1;\n"
+                  "    🖨️(x);\n"
+                  "}\n"
+                  "call show();\n")
+        self.check(source, "5\n1\nFunction returned: None\n")
+
+    def test_conditional_write(self):
+        source = ("x = 5;\n"
+                  "🎭 show(flag) {\n"
+                  "    🤔 (flag 📈 0) {\n"
+                  "        x = 1;\n"
+                  "    }\n"
+                  "    🖨️(x);\n"
+                  "}\n"
+                  "call show(0);\n"
+                  "call show(1);\n")
+        self.check(source, "5\nFunction returned: None\n1\nFunction returned: None\n")
+
+
+def optimized(source):
+    return translate((source,), "<test>", [])[1]
+
+
+class Inlining(ProgramTestCase):
+
+    def test_small_function_is_inlined(self):
+        source = ("🎭 add(a, b) {\n"
+                  "    r = a ➕ b;\n"
+                  "    🔙 r;\n"
+                  "}\n"
+                  "call add(5, 10);\n")
+        self.assertFalse([instr for instr in optimized(source) if instr.op == CALL])
+        self.check(source, "Function returned: 15\n")
+
+    def test_call_chain_collapses(self):
+        source = ("🎭 double(a) {\n"
+                  "    🔙 a ✖️ 2;\n"
+                  "}\n"
+                  "🎭 quadruple(a) {\n"
+                  "    call double(a);\n"
+                  "    🔙 a ✖️ 4;\n"
+                  "}\n"
+                  "call quadruple(3);\n")
+        self.assertFalse([instr for instr in optimized(source) if instr.op == CALL])
+        self.check(source, "Function returned: 6\nFunction returned: 12\n")
+
+    def test_recursive_function_is_not_inlined(self):
+        source = ("🎭 down(n) {\n"
+                  "    🤔 (n 📈 0) {\n"
+                  "        call down(n ➖ 1);\n"
+                  "    }\n"
+                  "    🔙 n;\n"
+                  "}\n"
+                  "call down(2);\n")
+        calls = [instr.label for instr in optimized(source) if instr.op == CALL]
+        self.assertIn("down", calls)
+        self.check(source, "Function returned: 0\nFunction returned: 1\nFunction returned: 2\n")
+
+    def test_callee_reading_a_shadowed_main_variable_is_not_inlined(self):
+        source = ("x = 1;\n"
+                  "🎭 show() {\n"
+                  "    🖨️(x);\n"
+                  "}\n"
+                  "🎭 outer(x) {\n"
+                  "    call show();\n"
+                  "}\n"
+                  "call outer(2);\n")
+        self.check(source, "1\nFunction returned: None\nFunction returned: None\n")
+
+    def test_profile_target_keeps_calls(self):
+        source = ("🎭 add(a, b) {\n"
+                  "    🔙 a ➕ b;\n"
+                  "}\n"
+                  "call add(5, 10);\n")
+        self.assertFalse([instr for instr in optimized(source) if instr.op == CALL])
+        with contextlib.redirect_stdout(io.StringIO()), \
+                contextlib.redirect_stderr(io.StringIO()) as profile:
+            emocode.run(source, target="profile")
+        calls = profile.getvalue().partition("== Calls (cumulative time) ==")[2]
+        self.assertIn("add", calls)
+
+
+def constants(code):
+    return [arg.value for instr in code for arg in instr.args if type(arg) is Const]
+
+
+class FoldingBounds(ProgramTestCase):
+    """Results too large to embed as literals are left for run time."""
+
+    def test_large_integer(self):
+        source = ("x = 2;\n" + "x = x ✖️ x;\n" * 14 +
+                  "🎭 down(n) {\n"
+                  "    🤔 (n 📈 0) {\n"
+                  "        call down(n ➖ 1);\n"
+                  "    }\n"
+                  "    🖨️(x 📈 0);\n"
+                  "}\n"
+                  "call down(1);\n")
+        for value in constants(optimized(source)):
+            if type(value) is int:
+                self.assertLessEqual(value.bit_length(), FOLD_MAX_INT_BITS)
+        self.check(source, "True\nFunction returned: None\nTrue\nFunction returned: None\n")
+
+    def test_long_string(self):
+        source = "s = \"ab\";\n" + "s = s ➕ s;\n" * 10 + "🖨️(s);\n"
+        for value in constants(optimized(source)):
+            if type(value) is str:
+                self.assertLessEqual(len(value), FOLD_MAX_STRING_LENGTH)
+        self.check(source, "ab" * 1024 + "\n")
+
+    def test_small_results_are_folded(self):
+        source = "x = 2;\n" + "x = x ✖️ x;\n" * 3 + "🖨️(x);\n"
+        self.assertIn(256, constants(optimized(source)))
+        self.check(source, "256\n")
+
+
+class FloorDivision(ProgramTestCase):
+    """'➗' floors, whether it is folded or computed at run time."""
+
+    def test_folded(self):
+        source = "a = 7 ➗ 2;\nb = (0 ➖ 7) ➗ 2;\n🖨️(a);\n🖨️(b);\n"
+        folded = constants(optimized(source))
+        self.assertIn(3, folded)
+        self.assertIn(-4, folded)
+        self.check(source, "3\n-4\n")
+
+    def test_at_run_time(self):
+        # A recursive function is not inlined, so its division is not folded.
+        source = ("🎭 half(n) {\n"
+                  "    🤔 (n 📉 0) {\n"
+                  "        call half(0);\n"
+                  "    }\n"
+                  "    🔙 n ➗ 2;\n"
+                  "}\n"
+                  "call half(7);\n"
+                  "call half(0 ➖ 7);\n")
+        self.assertIn("➗", [instr.op for instr in optimized(source)])
+        self.check(source, "Function returned: 3\nFunction returned: 0\nFunction returned: -4\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
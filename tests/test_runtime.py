@@ -0,0 +1,82 @@
+"""
+Tests of the shared runtime: binary containers run like the listings they
+encode, from a buffer or from a memory-mapped .emoc file.
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from helpers import run_output
+
+from codegen import encode_binary
+from emocode import translate
+from emocode_runtime import BINARY_MAGIC, RuntimeVersionError, run_binary
+from main import process_file
+
+PROGRAM = ("🏛 Person {\n"
+           "    🎭 greet(name) {\n"
+           "        🖨️(\"Hello\");\n"
+           "        🖨️(name);\n"
+           "    }\n"
+           "}\n"
+           "🎭 count(n) {\n"
+           "    total = 0;\n"
+           "    ➿ (i = 0; i 📉 n; i = i ➕ 1) {\n"
+           "        total = total ➕ i;\n"
+           "    }\n"
+           "    🔙 total;\n"
+           "}\n"
+           "big = 4294967296 ✖️ 4294967296;\n"
+           "call Person.greet(7);\n"
+           "call count(40);\n"
+           "🖨️(big);\n")
+
+
+def container_output(program):
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        run_binary(program)
+    return output.getvalue()
+
+
+class BinaryContainer(unittest.TestCase):
+
+    def setUp(self):
+        self.container = encode_binary(translate((PROGRAM,), "<test>", [])[1])
+        self.expected = run_output(PROGRAM, "interpreter")
+
+    def test_buffer_round_trip(self):
+        self.assertTrue(self.container.startswith(BINARY_MAGIC))
+        self.assertEqual(container_output(self.container), self.expected)
+
+    def test_file_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "program.emoc")
+            with open(filename, "wb") as container_file:
+                container_file.write(self.container)
+            self.assertEqual(container_output(filename), self.expected)
+
+    def test_other_version_is_refused(self):
+        stale = bytearray(self.container)
+        stale[len(BINARY_MAGIC)] ^= 0xFF
+        with self.assertRaises(RuntimeVersionError):
+            run_binary(bytes(stale))
+
+    def test_written_with_the_target_code(self):
+        # --run --dump both writes the files and runs the returned target code.
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "program.ec")
+            with open(filename, "w", encoding="utf-8") as source_file:
+                source_file.write(PROGRAM)
+            result = process_file(filename, "binary")
+            self.assertTrue(result.ok)
+            self.assertIsNotNone(result.target_code)
+            self.assertTrue(os.path.exists(os.path.join(directory, "program.py")))
+            self.assertEqual(container_output(os.path.join(directory, "program.emoc")),
+                             self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Streamed compilations, which parse a source segment by segment, must give
+what compiling the whole text at once gives.
+"""
+
+import unittest
+
+from helpers import ROOT
+
+from emocode import translate
+from streaming import split_statements
+
+PROGRAM = ("# Streamed sources are cut between top-level statements.\n"
+           "🏛 Person {\n"
+           "    🎭 sayHello() {\n"
+           "        🖨️(\"Car is moving; or not\");\n"
+           "    }\n"
+           "}\n"
+           "🎭 add(a, b) {\n"
+           "    🔙 a ➕ b;\n"
+           "}\n"
+           "x = 5; y = 10;\n"
+           "🤔 (x 📈 y) {\n"
+           "    🖨️(\"x is greater\");\n"
+           "} 🔄 {\n"
+           "    🖨️(\"y is greater\");\n"
+           "}\n"
+           "➿ (i = 0; i 📉 3; i = i ➕ 1) {\n"
+           "    x = x ➕ i;\n"
+           "}\n"
+           "call Person.sayHello;\n"
+           "call add(x, y);\n")
+
+
+def chunks(text, size):
+    return [text[pos:pos + size] for pos in range(0, len(text), size)]
+
+
+def compile_segments(segments, target="compiled"):
+    messages = []
+    translation = translate(segments, "<test>", messages, target)
+    return (None if translation is None else translation[2]), messages[1:]
+
+
+class StreamedMatchesWholeFile(unittest.TestCase):
+
+    def test_target_code(self):
+        for target in ("compiled", "interpreter"):
+            expected, _ = compile_segments((PROGRAM,), target)
+            for size in (1, 7, 64):
+                with self.subTest(target=target, chunk_size=size):
+                    segments = list(split_statements(chunks(PROGRAM, size)))
+                    self.assertGreater(len(segments), 1)
+                    self.assertEqual(compile_segments(segments, target)[0], expected)
+
+    def test_error_positions(self):
+        source = "x = 1; 🖨️(y);\n🤔 (x 📈 z) {\n    🖨️(x); 🖨️(w);\n}\n"
+        _, expected = compile_segments((source,))
+        self.assertTrue(expected)
+        for size in (1, 8, 64):
+            with self.subTest(chunk_size=size):
+                segments = list(split_statements(chunks(source, size)))
+                self.assertEqual(compile_segments(segments)[1], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
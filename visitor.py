@@ -0,0 +1,92 @@
+"""
+Shared AST traversal for the compiler passes. A pass subclasses Visitor
+and defines a visit_<kind> method per kind of node (nodes.Node.kind) it
+handles.
+
+A visit method that needs the results of child nodes is written as a
+generator: it yields each child and receives the child's result back from
+the yield expression, e.g.
+
+    def visit_binop(self, node):
+        left = yield node.left
+        right = yield node.right
+        return combine(left, right)
+
+Leaf methods simply return. The driver keeps the suspended methods on an
+explicit stack, so the nesting depth of the AST is not limited by Python's
+recursion limit.
+"""
+
+from inspect import isgeneratorfunction
+
+
+class Visitor:
+    # node kind -> (visit method, whether it is a generator), per subclass
+    _dispatch = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        dispatch = {}
+        for klass in reversed(cls.__mro__):
+            for attr, method in vars(klass).items():
+                if attr.startswith("visit_") and callable(method):
+                    dispatch[attr[6:]] = (method, isgeneratorfunction(method))
+        cls._dispatch = dispatch
+
+    def generic_visit(self, node):
+        """Called for node kinds without a visit method."""
+        return None
+
+    def visit(self, node):
+        """
+        Visits node with an explicit stack and returns the result of its
+        visit method. None nodes visit to None.
+        """
+        dispatch = self._dispatch
+        stack = [_root(node)]
+        send = None
+        while stack:
+            gen = stack[-1]
+            try:
+                child = gen.send(send)
+            except StopIteration as stop:
+                stack.pop()
+                send = stop.value
+                continue
+            if child is None:
+                send = None
+                continue
+            method, is_gen = dispatch.get(child.kind, _GENERIC)
+            if method is None:
+                send = self.generic_visit(child)
+            elif is_gen:
+                stack.append(method(self, child))
+                send = None
+            else:
+                send = method(self, child)
+        return send
+
+    def visit_recursive(self, node):
+        """Visits node with one Python call per nesting level instead."""
+        if node is None:
+            return None
+        method, is_gen = self._dispatch.get(node.kind, _GENERIC)
+        if method is None:
+            return self.generic_visit(node)
+        if not is_gen:
+            return method(self, node)
+        gen = method(self, node)
+        send = None
+        while True:
+            try:
+                child = gen.send(send)
+            except StopIteration as stop:
+                return stop.value
+            send = self.visit_recursive(child)
+
+
+def _root(node):
+    return (yield node)
+
+
+_GENERIC = (None, False)